@@ -0,0 +1,109 @@
+"""
+Runs the benchmark suite and compares it with a stored baseline.
+
+    python -m benchmarks.run                      # run and compare with benchmarks/baseline.json
+    python -m benchmarks.run -o result.json       # also write the results
+    python -m benchmarks.run -k equity -k game    # run some workloads only
+    python -m benchmarks.run --update-baseline    # store the results as the new baseline
+    python -m benchmarks.run --fail-on-regression # exit 1 on regression, to gate a deploy
+
+Each benchmark is the median of `repeat` runs. Slowdowns beyond the
+tolerance are reported; they only change the exit status with
+--fail-on-regression, since the baseline is only meaningful on the machine
+that recorded it.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+from benchmarks.workloads import WORKLOADS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+MIN_REPEAT = 5
+
+def run_benchmarks(names=None, repeat=MIN_REPEAT, log=None):
+    """Return {benchmark name: {"value", "unit"}} of the given workloads (all by default)."""
+    results = {}
+    for name, workload in WORKLOADS:
+        if names and name not in names: continue
+        for bench_name, value, unit in workload(repeat):
+            results[bench_name] = { "value": value, "unit": unit }
+            if log: log("%-36s %14.1f %s" % (bench_name, value, unit))
+    return results
+
+def compare(results, baseline, tolerance):
+    """Return (name, value, baseline value, ratio, regressed) of the benchmarks found in both.
+
+    All benchmarks are throughputs, so a ratio below 1 - tolerance is a regression.
+    """
+    rows = []
+    for name in sorted(results):
+        if name not in baseline: continue
+        value, base = results[name]["value"], baseline[name]["value"]
+        ratio = value / base if base else float("inf")
+        rows.append((name, value, base, ratio, ratio < 1.0 - tolerance))
+    return rows
+
+def build_report(results, repeat):
+    return {
+            "meta": {
+                "created_at": datetime.datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "machine": platform.machine(),
+                "platform": platform.platform(),
+                "repeat": repeat,
+                "statistic": "median"
+                },
+            "results": results
+            }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the engine's hot paths")
+    parser.add_argument("-k", "--workload", action="append", choices=[name for name, _ in WORKLOADS],
+            help="run this workload only (can be repeated)")
+    parser.add_argument("-r", "--repeat", type=int, default=MIN_REPEAT,
+            help="runs per benchmark, the median is kept (at least %d)" % MIN_REPEAT)
+    parser.add_argument("-o", "--output", help="write the results as json to this path")
+    parser.add_argument("-b", "--baseline", default=DEFAULT_BASELINE, help="baseline json to compare with")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.2,
+            help="allowed slowdown against the baseline (fraction)")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to the baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 when a benchmark regressed")
+    args = parser.parse_args(argv)
+    if args.repeat < MIN_REPEAT:
+        parser.error("--repeat must be at least %d" % MIN_REPEAT)
+
+    results = run_benchmarks(args.workload, args.repeat, log=print)
+    report = build_report(results, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline at %s" % args.baseline)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    rows = compare(results, baseline, args.tolerance)
+    print("")
+    print("%-36s %14s %14s %7s" % ("benchmark", "value", "baseline", "ratio"))
+    for name, value, base, ratio, regressed in rows:
+        print("%-36s %14.1f %14.1f %6.2fx%s" % (name, value, base, ratio, "  REGRESSION" if regressed else ""))
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print("%d benchmark(s) slower than the baseline by more than %d%%" % (len(regressions), args.tolerance * 100))
+        if args.fail_on_regression: return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Fixed workloads of the benchmark suite.
+
+Every workload uses pinned seeds so that the same work is measured on each
+run, and reports throughputs (higher is better) as (name, value, unit),
+computed from the median time of `repeat` runs.
+"""
+
+import random
+import statistics
+import time
+
+from pypokerengine.api.emulator import Emulator
+from pypokerengine.api.game import setup_config, start_poker
+from pypokerengine.engine.card import Card
+from pypokerengine.engine.compact_game_state import CompactGameState
+from pypokerengine.engine.compact_round_manager import CompactRoundManager
+from pypokerengine.engine.hand_evaluator import HandEvaluator
+from pypokerengine.engine.player import Player
+from pypokerengine.engine.poker_constants import PokerConstants as Const
+from pypokerengine.engine.round_manager import RoundManager
+from pypokerengine.engine.table import Table
+from pypokerengine.players import BasePokerPlayer, BaseHeadlessPlayer
+from pypokerengine.utils.card_utils import estimate_hole_card_equity, gen_cards
+from pypokerengine.utils.game_state_utils import deepcopy_game_state
+
+SEED = 0
+EVAL_HAND_NUM = 20000
+EQUITY_SIMULATION_NUMS = (100, 1000, 10000)
+COPY_NUM = 2000
+ROUND_NUM = 100
+GAME_ROUND_NUM = 30
+GAME_PLAYER_NUMS = (2, 6, 9)
+EMULATOR_ROUND_NUM = 20
+
+SMALL_BLIND_AMOUNT = 10
+INITIAL_STACK = 100000
+RAISE_RATE = 0.3
+
+def bench_eval_hand(repeat):
+    rng = random.Random(SEED)
+    hands = [rng.sample(range(1, 53), 7) for _ in range(EVAL_HAND_NUM)]
+    card_hands = [[Card.from_id(cid) for cid in hand] for hand in hands]
+    HandEvaluator.eval_hand_ids(hands[0][:2], hands[0][2:])  # load the rank tables
+    eval_cards = lambda: [HandEvaluator.eval_hand(cards[:2], cards[2:]) for cards in card_hands]
+    eval_ids = lambda: [HandEvaluator.eval_hand_ids(hand[:2], hand[2:]) for hand in hands]
+    return [
+            ("eval_hand_7cards", EVAL_HAND_NUM / _median_time(eval_cards, repeat), "hands/s"),
+            ("eval_hand_ids_7cards", EVAL_HAND_NUM / _median_time(eval_ids, repeat), "hands/s")
+            ]
+
+def bench_equity(repeat):
+    hole_card = gen_cards(["SA", "HK"])
+    results = []
+    for nb_simulation in EQUITY_SIMULATION_NUMS:
+        estimate = lambda: estimate_hole_card_equity(nb_simulation, 2, hole_card,
+                exact_threshold=0, rng=random.Random(SEED))
+        results.append(("equity_%d_simulations" % nb_simulation,
+            nb_simulation / _median_time(estimate, repeat), "simulations/s"))
+    return results
+
+def bench_state_copy(repeat):
+    state = _flop_state(6)
+    compact_state = CompactGameState.from_game_state(state)
+    copy_dict = lambda: [deepcopy_game_state(state) for _ in range(COPY_NUM)]
+    copy_compact = lambda: [compact_state.copy() for _ in range(COPY_NUM)]
+    return [
+            ("state_copy", COPY_NUM / _median_time(copy_dict, repeat), "copies/s"),
+            ("compact_state_copy", COPY_NUM / _median_time(copy_compact, repeat), "copies/s")
+            ]
+
+def bench_apply_action(repeat):
+    results = []
+    for name, play in (
+            ("apply_action", lambda table: _play_dict_rounds(table, inplace=False)),
+            ("apply_action_inplace", lambda table: _play_dict_rounds(table, inplace=True)),
+            ("compact_apply_action", lambda table: _play_compact_rounds(table, inplace=False)),
+            ("compact_apply_action_inplace", lambda table: _play_compact_rounds(table, inplace=True))):
+        action_num, elapsed = _median_run(play, lambda: (_seated_table(6),), repeat)
+        results.append((name, action_num / elapsed, "actions/s"))
+    return results
+
+def bench_game(repeat):
+    results = []
+    for player_num in GAME_PLAYER_NUMS:
+        play = lambda: _play_game(player_num, headless=False)
+        results.append(("game_%d_players" % player_num, GAME_ROUND_NUM / _median_time(play, repeat), "rounds/s"))
+        play = lambda: _play_game(player_num, headless=True)
+        results.append(("headless_game_%d_players" % player_num, GAME_ROUND_NUM / _median_time(play, repeat), "rounds/s"))
+    return results
+
+def bench_emulator(repeat):
+    return [("emulator_run_until_game_finish", EMULATOR_ROUND_NUM / _median_time(_emulate_game, repeat), "rounds/s")]
+
+WORKLOADS = [
+        ("eval_hand", bench_eval_hand),
+        ("equity", bench_equity),
+        ("state_copy", bench_state_copy),
+        ("apply_action", bench_apply_action),
+        ("game", bench_game),
+        ("emulator", bench_emulator)
+        ]
+
+class CallRaisePlayer(BasePokerPlayer):
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def declare_action(self, valid_actions, hole_card, round_state):
+        names = [action["action"] for action in valid_actions]
+        return "raise" if "raise" in names and self.rng.random() < RAISE_RATE else "call"
+
+    def receive_game_start_message(self, game_info):
+        pass
+
+    def receive_round_start_message(self, round_count, hole_card, seats):
+        pass
+
+    def receive_street_start_message(self, street, round_state):
+        pass
+
+    def receive_game_update_message(self, new_action, round_state):
+        pass
+
+    def receive_round_result_message(self, winners, hand_info, round_state):
+        pass
+
+class HeadlessCallRaisePlayer(BaseHeadlessPlayer):
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def declare_action(self, state, legal_actions):
+        return "raise" if "raise" in legal_actions and self.rng.random() < RAISE_RATE else "call"
+
+def _median_time(function, repeat):
+    return _median_run(lambda: function(), lambda: (), repeat)[1]
+
+# Runs setup() then function(*setup()) repeat times. Returns the result and the median time.
+def _median_run(function, setup, repeat):
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+def _seated_table(player_num):
+    table = Table(rng=random.Random(SEED))
+    for pos in range(player_num):
+        table.seats.sitdown(Player("uuid-%d" % pos, INITIAL_STACK, "p%d" % pos))
+    table.set_blind_pos(0, 1)
+    return table
+
+def _flop_state(player_num):
+    state, _ = RoundManager.start_new_round(1, SMALL_BLIND_AMOUNT, 0, _seated_table(player_num))
+    while state["street"] == Const.Street.PREFLOP:
+        state, _ = RoundManager.apply_action(state, "call")
+    return state
+
+def _play_dict_rounds(table, inplace):
+    rng = random.Random(SEED)
+    action_num = 0
+    for round_count in range(1, ROUND_NUM+1):
+        state, _ = RoundManager.start_new_round(round_count, SMALL_BLIND_AMOUNT, 0, table)
+        while state["street"] != Const.Street.FINISHED:
+            action = "raise" if rng.random() < RAISE_RATE else "call"
+            state, _ = RoundManager.apply_action(state, action, inplace=inplace)
+            action_num += 1
+    return action_num
+
+def _play_compact_rounds(table, inplace):
+    rng = random.Random(SEED)
+    initial_state = CompactGameState.from_table(table)
+    action_num = 0
+    for round_count in range(1, ROUND_NUM+1):
+        state = CompactRoundManager.start_new_round(round_count, SMALL_BLIND_AMOUNT, 0, initial_state)
+        while state.street != Const.Street.FINISHED:
+            action = "raise" if rng.random() < RAISE_RATE else "call"
+            state = CompactRoundManager.apply_action(state, action, inplace=inplace)
+            action_num += 1
+    return action_num
+
+def _play_game(player_num, headless):
+    random.seed(SEED)
+    config = setup_config(GAME_ROUND_NUM, INITIAL_STACK, SMALL_BLIND_AMOUNT)
+    player_class = HeadlessCallRaisePlayer if headless else CallRaisePlayer
+    for pos in range(player_num):
+        config.register_player("p%d" % pos, player_class(SEED + pos))
+    return start_poker(config, verbose=0, headless=headless, rng=random.Random(SEED))
+
+def _emulate_game():
+    emulator = Emulator(rng=random.Random(SEED))
+    emulator.set_game_rule(2, EMULATOR_ROUND_NUM, SMALL_BLIND_AMOUNT, 0)
+    players_info = {}
+    for pos in range(2):
+        uuid = "uuid-%d" % pos
+        emulator.register_player(uuid, CallRaisePlayer(SEED + pos))
+        players_info[uuid] = { "name": "p%d" % pos, "stack": INITIAL_STACK }
+    game_state = emulator.generate_initial_game_state(players_info)
+    game_state, _ = emulator.start_new_round(game_state)
+    return emulator.run_until_game_finish(game_state)
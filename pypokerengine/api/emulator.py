@@ -1,3 +1,6 @@
+import random
+import time
+
 from pypokerengine.engine.table import Table
 from pypokerengine.engine.seats import Seats
 from pypokerengine.engine.card import Card
@@ -11,11 +14,15 @@ from pypokerengine.engine.action_checker import ActionChecker
 from pypokerengine.engine.message_builder import MessageBuilder
 from pypokerengine.players import BasePokerPlayer
 from pypokerengine.utils.game_state_utils import deepcopy_game_state
-from pypokerengine.utils.timeout_decorator import timeout2
+from pypokerengine.utils.deadline import deadline_budget, DECISION_SECONDS
+from pypokerengine.utils.latency import ThinkTimeRecorder, timeout_count
 
 class Emulator(object):
 
-    def __init__(self):
+    # rng (random module by default, or a random.Random) shuffles the deck of every new round
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.think_time = ThinkTimeRecorder(DECISION_SECONDS)
         self.game_rule = {}
         self.blind_structure = {}
         self.players_holder = {}
@@ -33,9 +40,9 @@ class Emulator(object):
         if not isinstance(player, BasePokerPlayer):
             raise TypeError("player must inherit %s class." % BasePokerPlayer)
         
-        # Wrap the function with a timeout
-        default_action_info      = ("fold",0)  # Fold
-        player.declare_action = timeout2(0.5,default_action_info)(player.declare_action)
+        # Give every decision DECISION_SECONDS (see player.deadline), fold when it is missed
+        default_action_info      = "fold"
+        player.declare_action = deadline_budget(DECISION_SECONDS,default_action_info)(player.declare_action)
         
         self.players_holder[uuid] = player
 
@@ -43,7 +50,7 @@ class Emulator(object):
         return self.players_holder[uuid]
 
     def generate_initial_game_state(self, players_info):
-        table = Table()
+        table = Table(rng=self.rng)
         for uuid, info in players_info.items():
             table.seats.sitdown(Player(uuid, info["stack"], info["name"]))
 
@@ -81,14 +88,19 @@ class Emulator(object):
 
     def run_until_round_finish(self, game_state):
         mailbox = []
+        game_state = deepcopy_game_state(game_state)
         while game_state["street"] != Const.Street.FINISHED:
             next_player_pos = game_state["next_player"]
             next_player_uuid = game_state["table"].seats.players[next_player_pos].uuid
             next_player_algorithm = self.fetch_player(next_player_uuid)
             msg = MessageBuilder.build_ask_message(next_player_pos, game_state)["message"]
-            action, amount = next_player_algorithm.declare_action(\
+            timeouts = timeout_count(next_player_algorithm)
+            start = time.perf_counter()
+            action = next_player_algorithm.declare_action(\
                     msg["valid_actions"], msg["hole_card"], msg["round_state"])
-            game_state, messages = RoundManager.apply_action(game_state, action, amount)
+            self.think_time.record(next_player_uuid, game_state["street"], time.perf_counter() - start,
+                    timeout_count(next_player_algorithm) > timeouts)
+            game_state, messages = RoundManager.apply_action(game_state, action, inplace=True)
             mailbox += messages
         events = [self.create_event(message[1]["message"]) for message in mailbox]
         events = [e for e in events if e]
@@ -118,6 +130,7 @@ class Emulator(object):
         ante, sb_amount = self.game_rule["ante"], self.game_rule["sb_amount"]
         deepcopy = deepcopy_game_state(game_state)
         deepcopy_table = deepcopy["table"]
+        deepcopy_table.deck.rng = self.rng
         deepcopy_table.shift_dealer_btn()
 
         ante, sb_amount = update_blind_level(ante, sb_amount, round_count, self.blind_structure)
@@ -125,7 +138,7 @@ class Emulator(object):
         is_game_finished = len([1 for p in deepcopy_table.seats.players if p.is_active()])==1
         if is_game_finished: return deepcopy, self._generate_game_result_event(deepcopy)
 
-        new_state, messages = RoundManager.start_new_round(round_count, sb_amount, ante, deepcopy_table)
+        new_state, messages = RoundManager.start_new_round(round_count, sb_amount, ante, deepcopy_table, inplace=True)
         events = [self.create_event(message[1]["message"]) for message in messages]
         events = [e for e in events if e]
         return new_state, events
@@ -1,20 +1,38 @@
+import random
+
 from pypokerengine.engine.dealer import Dealer
-from pypokerengine.players import BasePokerPlayer
-from pypokerengine.utils.timeout_decorator import timeout2
+from pypokerengine.players import BasePokerPlayer, BaseHeadlessPlayer
+from pypokerengine.utils.deadline import deadline_budget, DECISION_SECONDS
+from pypokerengine.utils.profiler import Profiler
 
 def setup_config(max_round, initial_stack, small_blind_amount, ante=0):
     return Config(max_round, initial_stack, small_blind_amount, ante)
 
-def start_poker(config, verbose=2):
+# headless=True runs the game without messages for BaseHeadlessPlayer players
+# (verbose is ignored). Use it to simulate many hands quickly.
+# rng (e.g. random.Random(seed)) makes the deals and uuids reproducible.
+# profile=True adds the engine's per-phase timings (see utils.profiler) as result["profile"].
+def start_poker(config, verbose=2, headless=False, rng=random, profile=False):
     config.validation()
-    dealer = Dealer(config.sb_amount, config.initial_stack, config.ante)
+    if headless: config.headless_validation()
+    dealer = Dealer(config.sb_amount, config.initial_stack, config.ante, rng)
     dealer.set_verbose(verbose)
+    dealer.think_time.budget = DECISION_SECONDS
     dealer.set_blind_structure(config.blind_structure)
     for info in config.players_info:
         dealer.register_player(info["name"], info["algorithm"])
         # print(info["algorithm"].declare_action)
-    result_message = dealer.start_game(config.max_round)
-    return _format_result(result_message)
+    profiler = Profiler() if profile else None
+    if profiler: profiler.enable()
+    try:
+        result_message = dealer.start_game(config.max_round, headless=headless)
+    finally:
+        if profiler: profiler.disable()
+    result = _format_result(result_message)
+    if profiler: result["profile"] = profiler.summary()
+    players = [(player["uuid"], player["name"]) for player in result["players"]]
+    result["think_time"] = dealer.think_time.summary(players)
+    return result
 
 def _format_result(result_message):
     return {
@@ -33,13 +51,17 @@ class Config(object):
         self.ante = ante
 
     def register_player(self, name, algorithm):
+        if isinstance(algorithm, BaseHeadlessPlayer):
+            # headless players are not wrapped by the deadline, which costs a thread handoff per action
+            self.players_info.append({ "name" : name, "algorithm" : algorithm })
+            return
         if not isinstance(algorithm, BasePokerPlayer):
-            base_msg = 'Poker player must be child class of "BasePokerPlayer". But its parent was "%s"'
+            base_msg = 'Poker player must be child class of "BasePokerPlayer" or "BaseHeadlessPlayer". But its parent was "%s"'
             raise TypeError(base_msg % algorithm.__class__.__bases__)
 
-        # Wrap the function with a timeout
+        # Give every decision DECISION_SECONDS (see algorithm.deadline), fold when it is missed
         default_action_info      = "fold"
-        algorithm.declare_action = timeout2(0.5,default_action_info)(algorithm.declare_action)
+        algorithm.declare_action = deadline_budget(DECISION_SECONDS,default_action_info)(algorithm.declare_action)
         info = { "name" : name, "algorithm" : algorithm }
         self.players_info.append(info)
 
@@ -53,3 +75,8 @@ class Config(object):
             base_msg = "At least 2 players are needed to start the game"
             raise Exception("%s (but %s.)" % (base_msg, detail_msg))
 
+    def headless_validation(self):
+        for info in self.players_info:
+            if not isinstance(info["algorithm"], BaseHeadlessPlayer):
+                base_msg = 'Headless game needs players of "BaseHeadlessPlayer". But "%s" was "%s"'
+                raise TypeError(base_msg % (info["name"], info["algorithm"].__class__.__name__))
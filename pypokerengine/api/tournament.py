@@ -0,0 +1,122 @@
+"""
+Plays many independent games over a process pool.
+
+Every game gets its own seed and fresh player instances, so results do not
+depend on how games are spread over the workers. The seed drives the engine
+rng (deals and uuids) and, through a derived seed, the random and np.random
+modules the players may draw from.
+
+Players are given as (name, factory) pairs where factory() builds the
+algorithm. Factories must be picklable (e.g. classes defined at module level).
+"""
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only seeded for players drawing from np.random
+    np = None
+
+from pypokerengine.api.game import setup_config, start_poker
+
+Z_95 = 1.96
+
+def run_tournament(players, nb_game, max_round, initial_stack, small_blind_amount, ante=0,
+        blind_structure=None, seed=0, nb_worker=None, headless=False, callback=None):
+    """Play nb_game games and return {"games": results ordered by game, "players": summary}.
+
+    callback(result) is called for every game as soon as it finishes.
+    See summarize_tournament for the summary format.
+    """
+    results = []
+    for result in iter_tournament(players, nb_game, max_round, initial_stack, small_blind_amount,
+            ante, blind_structure, seed, nb_worker, headless):
+        results.append(result)
+        if callback: callback(result)
+    results.sort(key=lambda result: result["game"])
+    return {
+            "games": results,
+            "players": summarize_tournament([name for name, _ in players], results)
+            }
+
+# Yields {"game", "seed", "stacks", "think_time", "time"} for every game in the order they finish
+def iter_tournament(players, nb_game, max_round, initial_stack, small_blind_amount, ante=0,
+        blind_structure=None, seed=0, nb_worker=None, headless=False):
+    tasks = [(game, "%s-%d" % (seed, game), players, max_round, initial_stack, small_blind_amount,
+        ante, blind_structure or {}, headless) for game in range(1, nb_game+1)]
+    nb_worker = nb_worker or os.cpu_count() or 1
+    if nb_worker == 1:
+        for task in tasks: yield _play_game(task)
+        return
+    with ProcessPoolExecutor(max_workers=nb_worker) as executor:
+        futures = [executor.submit(_play_game, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+def summarize_tournament(names, results):
+    """Return one {"name", "mean_stack", "stack_ci", "wins", "win_rate", "win_rate_ci"} per player.
+
+    *_ci are half widths of the 95% confidence intervals (normal approximation).
+    A game is won by the largest final stack, shared equally on ties.
+    """
+    nb_game = len(results)
+    wins = [0.0] * len(names)
+    for result in results:
+        best = max(result["stacks"])
+        winners = [pos for pos, stack in enumerate(result["stacks"]) if stack == best]
+        for pos in winners: wins[pos] += 1.0 / len(winners)
+    summary = []
+    for pos, name in enumerate(names):
+        stacks = [result["stacks"][pos] for result in results]
+        mean, ci = _mean_and_ci(stacks)
+        win_rate = wins[pos] / nb_game if nb_game else 0.0
+        summary.append({
+            "name": name,
+            "mean_stack": mean,
+            "stack_ci": ci,
+            "wins": wins[pos],
+            "win_rate": win_rate,
+            "win_rate_ci": Z_95 * math.sqrt(win_rate * (1 - win_rate) / nb_game) if nb_game else 0.0
+            })
+    return summary
+
+def _mean_and_ci(values):
+    if not values: return 0.0, 0.0
+    mean = 1.0 * sum(values) / len(values)
+    if len(values) == 1: return mean, 0.0
+    variance = sum([(value - mean)**2 for value in values]) / (len(values) - 1)
+    return mean, Z_95 * math.sqrt(variance / len(values))
+
+# The global generators are seeded for agents that use them, and restored
+# afterwards since inline games (nb_worker=1) run in the caller's process.
+def _play_game(task):
+    random_state = random.getstate()
+    np_state = np.random.get_state() if np is not None else None
+    try:
+        return _play_seeded_game(task)
+    finally:
+        random.setstate(random_state)
+        if np is not None: np.random.set_state(np_state)
+
+def _play_seeded_game(task):
+    game, game_seed, players, max_round, initial_stack, small_blind_amount, ante, blind_structure, headless = task
+    rng = random.Random(game_seed)
+    random.seed(rng.getrandbits(64))
+    if np is not None: np.random.seed(rng.getrandbits(32))
+    config = setup_config(max_round, initial_stack, small_blind_amount, ante)
+    config.set_blind_structure(blind_structure)
+    for name, factory in players:
+        config.register_player(name, factory())
+    start = time.time()
+    game_result = start_poker(config, verbose=0, headless=headless, rng=rng)
+    return {
+            "game": game,
+            "seed": game_seed,
+            "stacks": [player["stack"] for player in game_result["players"]],
+            "think_time": game_result["think_time"],
+            "time": time.time() - start
+            }
@@ -1,4 +1,8 @@
-class Card:
+# Cards are immutable. Card.from_id and Card.from_str return the shared
+# instance of the card instead of creating a new object on every call.
+class Card(object):
+
+  __slots__ = ("suit", "rank")
 
   CLUB = 2
   DIAMOND = 4
@@ -28,14 +32,39 @@ class Card:
       14 : 'A'
   }
 
+  SUIT_INDEX_MAP = {
+      2  : 0,
+      4  : 1,
+      8  : 2,
+      16 : 3
+  }
+
 
   def __init__(self, suit, rank):
-    self.suit = suit
-    self.rank = 14 if rank == 1 else rank
+    object.__setattr__(self, "suit", suit)
+    object.__setattr__(self, "rank", 14 if rank == 1 else rank)
+
+  def __setattr__(self, name, value):
+    raise AttributeError("Card is immutable")
+
+  def __delattr__(self, name):
+    raise AttributeError("Card is immutable")
 
   def __eq__(self, other):
+    if not isinstance(other, Card): return NotImplemented
     return self.suit == other.suit and self.rank == other.rank
 
+  def __ne__(self, other):
+    eq = self.__eq__(other)
+    return eq if eq is NotImplemented else not eq
+
+  def __hash__(self):
+    return self.to_id()
+
+  # pickle and copy resolve to the shared instance
+  def __reduce__(self):
+    return (Card.from_id, (self.to_id(),))
+
   def __str__(self):
     suit = self.SUIT_MAP[self.suit]
     rank = self.RANK_MAP[self.rank]
@@ -43,28 +72,17 @@ class Card:
 
   def to_id(self):
     rank = 1 if self.rank == 14 else self.rank
-    num = 0
-    tmp = self.suit >> 1
-    while tmp&1 != 1:
-      num += 1
-      tmp >>= 1
-
-    return rank + 13 * num
+    return rank + 13 * self.SUIT_INDEX_MAP[self.suit]
 
   @classmethod
   def from_id(cls, card_id):
-    suit, rank = 2, card_id
-    while rank > 13:
-      suit <<= 1
-      rank -= 13
-
-    return cls(suit, rank)
+    return _ID_TO_CARD[card_id]
 
   @classmethod
   def from_str(cls, str_card):
     assert(len(str_card)==2)
-    inverse = lambda hsh: {v:k for k,v in hsh.items()}
-    suit = inverse(cls.SUIT_MAP)[str_card[0].upper()]
-    rank = inverse(cls.RANK_MAP)[str_card[1]]
-    return cls(suit, rank)
+    return _STR_TO_CARD[str_card[0].upper() + str_card[1]]
+
 
+_ID_TO_CARD = [None] + [Card(2 << (cid-1) // 13, (cid-1) % 13 + 1) for cid in range(1, 53)]
+_STR_TO_CARD = dict((str(card), card) for card in _ID_TO_CARD[1:])
@@ -0,0 +1,243 @@
+import random
+from array import array
+
+from pypokerengine.engine.table import Table
+from pypokerengine.engine.deck import Deck
+from pypokerengine.engine.player import Player
+from pypokerengine.engine.pay_info import PayInfo
+from pypokerengine.engine.poker_constants import PokerConstants as Const
+
+# Flat counterpart of the dict game state used by RoundManager
+# ({"round_count", "small_blind_amount", "street", "next_player", "table"}).
+#
+# Every number of the state lives in one array("q") laid out as
+#   [globals][community card ids][deck card ids][players][action log]
+# so copy() is a single buffer copy. Names, uuids and the cheat deck never
+# change during a game and are shared between copies, as is the rng used to
+# shuffle the deck (Deck.rng).
+#
+# The player fields hold what RoundManager and ActionChecker derive from the
+# Player objects (paid sum, number of actions, raise count, ...). The action
+# log keeps one entry per action history, so to_game_state can rebuild the
+# Player objects exactly.
+
+# globals
+ROUND_COUNT        = 0
+SMALL_BLIND_AMOUNT = 1
+STREET             = 2
+NEXT_PLAYER        = 3
+DEALER_BTN         = 4
+SB_POS             = 5
+BB_POS             = 6
+AGREE_AMOUNT       = 7   # amount of the largest RAISE/SMALLBLIND/BIGBLIND in this street
+LAST_ADD_AMOUNT    = 8   # its add_amount, NO_RAISE if the street has none
+SAVED_STREET_FLG   = 9   # bit flg of streets whose histories are saved (round_action_histories)
+COMMUNITY_NUM      = 10
+DECK_NUM           = 11
+PLAYER_NUM         = 12
+CHEAT              = 13
+GLOBAL_SIZE        = 14
+
+COMMUNITY = GLOBAL_SIZE
+DECK = COMMUNITY + 5
+PLAYERS = DECK + 52
+
+# player fields (offset from player_base(pos))
+STACK        = 0
+PAY_AMOUNT   = 1
+PAY_STATUS   = 2
+PAID_SUM     = 3
+ACTION_NUM   = 4   # number of action histories in this street
+FIRST_ACTION = 5   # kind (Const.Action) of the first of them, NO_ACTION if none
+RAISE_NUM    = 6   # number of RAISE in this round
+HOLE_CARD    = 7   # 2 card ids, 0 if not dealt
+PLAYER_SIZE  = 9
+
+# action log entry : [street, player pos, kind, amount, paid, add_amount]
+LOG_SIZE = 6
+
+NOT_FOUND = -1
+NO_RAISE = -1
+NO_ACTION = -1
+
+def player_base(pos):
+  return PLAYERS + pos * PLAYER_SIZE
+
+class CompactGameState(object):
+
+  __slots__ = ("data", "names", "uuids", "cheat_card_ids", "rng")
+
+  def __init__(self, data, names, uuids, cheat_card_ids=(), rng=random):
+    self.data = data
+    self.names = names
+    self.uuids = uuids
+    self.cheat_card_ids = cheat_card_ids
+    self.rng = rng
+
+  def copy(self):
+    return CompactGameState(self.data[:], self.names, self.uuids, self.cheat_card_ids, self.rng)
+
+  @property
+  def round_count(self):
+    return self.data[ROUND_COUNT]
+
+  @property
+  def small_blind_amount(self):
+    return self.data[SMALL_BLIND_AMOUNT]
+
+  @property
+  def street(self):
+    return self.data[STREET]
+
+  @property
+  def next_player(self):
+    return self.data[NEXT_PLAYER]
+
+  @property
+  def player_num(self):
+    return self.data[PLAYER_NUM]
+
+  def community_card_ids(self):
+    return self.data[COMMUNITY:COMMUNITY+self.data[COMMUNITY_NUM]].tolist()
+
+  def deck_card_ids(self):
+    return self.data[DECK:DECK+self.data[DECK_NUM]].tolist()
+
+  def stack(self, pos):
+    return self.data[player_base(pos) + STACK]
+
+  def pay_amount(self, pos):
+    return self.data[player_base(pos) + PAY_AMOUNT]
+
+  def pay_status(self, pos):
+    return self.data[player_base(pos) + PAY_STATUS]
+
+  def hole_card_ids(self, pos):
+    base = player_base(pos) + HOLE_CARD
+    return [cid for cid in self.data[base:base+2] if cid != 0]
+
+  # Table before RoundManager.start_new_round (blind position already set)
+  @classmethod
+  def from_table(self, table):
+    return self.from_game_state({
+      "round_count": 0,
+      "small_blind_amount": 0,
+      "street": Const.Street.PREFLOP,
+      "next_player": Table._player_not_found,
+      "table": table
+    })
+
+  @classmethod
+  def from_game_state(self, game_state):
+    table = game_state["table"]
+    players = table.seats.players
+    deck_ids = table.deck.deck
+    community_ids = table.get_community_card_ids()
+    blind_pos = table._blind_pos or [NOT_FOUND, NOT_FOUND]
+    next_player = game_state["next_player"]
+
+    data = array("q", [0] * (PLAYERS + len(players) * PLAYER_SIZE))
+    data[ROUND_COUNT] = game_state["round_count"]
+    data[SMALL_BLIND_AMOUNT] = game_state["small_blind_amount"]
+    data[STREET] = game_state["street"]
+    data[NEXT_PLAYER] = NOT_FOUND if next_player == Table._player_not_found else next_player
+    data[DEALER_BTN] = table.dealer_btn
+    data[SB_POS], data[BB_POS] = blind_pos
+    data[COMMUNITY_NUM] = len(community_ids)
+    data[COMMUNITY:COMMUNITY+len(community_ids)] = array("q", community_ids)
+    data[DECK_NUM] = len(deck_ids)
+    data[DECK:DECK+len(deck_ids)] = array("q", deck_ids)
+    data[PLAYER_NUM] = len(players)
+    data[CHEAT] = 1 if table.deck.cheat else 0
+
+    last_raise = None
+    for pos, player in enumerate(players):
+      base = player_base(pos)
+      data[base+STACK] = player.stack
+      data[base+PAY_AMOUNT] = player.pay_info.amount
+      data[base+PAY_STATUS] = player.pay_info.status
+      data[base+PAID_SUM] = player.paid_sum()
+      data[base+ACTION_NUM] = len(player.action_histories)
+      data[base+FIRST_ACTION] = _ACTION_KIND[player.action_histories[0]["action"]] if player.action_histories else NO_ACTION
+      data[base+HOLE_CARD:base+HOLE_CARD+len(player.hole_card_ids)] = array("q", player.hole_card_ids)
+      for street, histories in enumerate(player.round_action_histories):
+        if histories is None: continue
+        data[SAVED_STREET_FLG] |= 1 << street
+        for history in histories: self.__append_log(data, street, pos, history)
+      for history in player.action_histories:
+        self.__append_log(data, game_state["street"], pos, history)
+        if history["action"] in _RAISE_ACTIONS and (last_raise is None or history["amount"] > last_raise["amount"]):
+          last_raise = history
+    for offset in range(PLAYERS + len(players) * PLAYER_SIZE, len(data), LOG_SIZE):
+      if data[offset+2] == Const.Action.RAISE: data[player_base(data[offset+1]) + RAISE_NUM] += 1
+    data[AGREE_AMOUNT] = last_raise["amount"] if last_raise else 0
+    data[LAST_ADD_AMOUNT] = last_raise["add_amount"] if last_raise else NO_RAISE
+
+    names = tuple([player.name for player in players])
+    uuids = tuple([player.uuid for player in players])
+    return self(data, names, uuids, tuple(table.deck.cheat_card_ids), table.deck.rng)
+
+  def to_game_state(self):
+    data = self.data
+    deck = Deck(cheat=data[CHEAT] == 1, cheat_card_ids=list(self.cheat_card_ids), rng=self.rng)
+    deck.deck = self.deck_card_ids()
+    table = Table(cheat_deck=deck)
+    table.dealer_btn = data[DEALER_BTN]
+    if data[SB_POS] != NOT_FOUND: table.set_blind_pos(data[SB_POS], data[BB_POS])
+    table._community_card = self.community_card_ids()
+    for pos in range(data[PLAYER_NUM]):
+      base = player_base(pos)
+      player = Player(self.uuids[pos], data[base+STACK], self.names[pos])
+      player.hole_card_ids = self.hole_card_ids(pos)
+      player.pay_info = PayInfo(data[base+PAY_AMOUNT], data[base+PAY_STATUS])
+      table.seats.sitdown(player)
+    players = table.seats.players
+    round_histories = [[[] if data[SAVED_STREET_FLG] >> street & 1 else None for street in range(4)] for _ in players]
+    histories = [[] for _ in players]
+    for offset in range(player_base(data[PLAYER_NUM]), len(data), LOG_SIZE):
+      street, pos, kind, amount, paid, add_amount = data[offset:offset+LOG_SIZE]
+      saved = data[SAVED_STREET_FLG] >> street & 1
+      target = round_histories[pos][street] if saved else histories[pos]
+      target.append(self.__build_history(players[pos].uuid, kind, amount, paid, add_amount))
+    for pos, player in enumerate(players):
+      player.round_action_histories = round_histories[pos]
+      player.action_histories = histories[pos]
+    return {
+      "round_count": data[ROUND_COUNT],
+      "small_blind_amount": data[SMALL_BLIND_AMOUNT],
+      "street": data[STREET],
+      "next_player": Table._player_not_found if data[NEXT_PLAYER] == NOT_FOUND else data[NEXT_PLAYER],
+      "table": table
+    }
+
+  @classmethod
+  def __append_log(self, data, street, pos, history):
+    kind = _ACTION_KIND[history["action"]]
+    data.extend((street, pos, kind, history.get("amount", 0), history.get("paid", 0), history.get("add_amount", 0)))
+
+  # same key order as the histories built by Player
+  def __build_history(self, uuid, kind, amount, paid, add_amount):
+    if kind == Const.Action.FOLD:
+      history = { "action": Player.ACTION_FOLD_STR }
+    elif kind == Const.Action.CALL:
+      history = { "action": Player.ACTION_CALL_STR, "amount": amount, "paid": paid }
+    elif kind == Const.Action.RAISE:
+      history = { "action": Player.ACTION_RAISE_STR, "amount": amount, "paid": paid, "add_amount": add_amount }
+    elif kind == Const.Action.ANTE:
+      history = { "action": Player.ACTION_ANTE, "amount": amount }
+    else:
+      action = Player.ACTION_SMALL_BLIND if kind == Const.Action.SMALL_BLIND else Player.ACTION_BIG_BLIND
+      history = { "action": action, "amount": amount, "add_amount": add_amount }
+    history["uuid"] = uuid
+    return history
+
+_ACTION_KIND = {
+    Player.ACTION_FOLD_STR: Const.Action.FOLD,
+    Player.ACTION_CALL_STR: Const.Action.CALL,
+    Player.ACTION_RAISE_STR: Const.Action.RAISE,
+    Player.ACTION_SMALL_BLIND: Const.Action.SMALL_BLIND,
+    Player.ACTION_BIG_BLIND: Const.Action.BIG_BLIND,
+    Player.ACTION_ANTE: Const.Action.ANTE
+}
+
+_RAISE_ACTIONS = (Player.ACTION_RAISE_STR, Player.ACTION_SMALL_BLIND, Player.ACTION_BIG_BLIND)
@@ -0,0 +1,321 @@
+from array import array
+
+from pypokerengine.engine.pay_info import PayInfo
+from pypokerengine.engine.poker_constants import PokerConstants as Const
+from pypokerengine.engine.action_checker import ActionChecker
+from pypokerengine.engine.hand_evaluator import HandEvaluator
+from pypokerengine.engine.game_evaluator import GameEvaluator
+from pypokerengine.engine.compact_game_state import player_base, NOT_FOUND, NO_RAISE, NO_ACTION,\
+    ROUND_COUNT, SMALL_BLIND_AMOUNT, STREET, NEXT_PLAYER, SB_POS, BB_POS, AGREE_AMOUNT, LAST_ADD_AMOUNT,\
+    SAVED_STREET_FLG, COMMUNITY, COMMUNITY_NUM, DECK, DECK_NUM, PLAYER_NUM, CHEAT,\
+    STACK, PAY_AMOUNT, PAY_STATUS, PAID_SUM, ACTION_NUM, FIRST_ACTION, RAISE_NUM, HOLE_CARD, PLAYER_SIZE
+
+# RoundManager over CompactGameState.
+# Follows the same rules step by step (including ActionChecker's action
+# correction and GameEvaluator's pot split) but builds no messages, so it
+# is meant for search and rollouts. States are copied unless inplace=True.
+
+class CompactRoundManager:
+
+  @classmethod
+  def start_new_round(self, round_count, small_blind_amount, ante_amount, state, inplace=False):
+    state = state if inplace else state.copy()
+    data = state.data
+    data[ROUND_COUNT] = round_count
+    data[SMALL_BLIND_AMOUNT] = small_blind_amount
+    data[STREET] = Const.Street.PREFLOP
+
+    self.__shuffle_deck(state)
+    self.__correct_ante(data, ante_amount)
+    self.__correct_blind(data, small_blind_amount)
+    self.__deal_holecard(data)
+    self.__start_street(state)
+    return state
+
+  @classmethod
+  def apply_action(self, original_state, action, inplace=False):
+    state = original_state if inplace else original_state.copy()
+    data = state.data
+    self.__update_state_by_action(data, action)
+    if self.__is_everyone_agreed(data):
+      self.__save_street_action_histories(data)
+      data[STREET] += 1
+      self.__start_street(state)
+    else:
+      data[NEXT_PLAYER] = self.__next_ask_waiting_player_pos(data, data[NEXT_PLAYER])
+    return state
+
+  @classmethod
+  def legal_actions(self, state):
+    if self.__can_raise(state.data):
+      return [
+          { "action" : "fold"  },
+          { "action" : "call" },
+          { "action" : "raise"}
+      ]
+    else:
+      return [
+        {"action": "fold"},
+        {"action": "call"}
+      ]
+
+  # Names of legal_actions(state) as a shared tuple
+  @classmethod
+  def legal_action_names(self, state):
+    return self.__FOLD_CALL_RAISE if self.__can_raise(state.data) else self.__FOLD_CALL
+
+  __FOLD_CALL = ("fold", "call")
+  __FOLD_CALL_RAISE = ("fold", "call", "raise")
+
+  @classmethod
+  def __can_raise(self, data):
+    raise_amount, raise_limit = ActionChecker.round_raise_amount(data[SMALL_BLIND_AMOUNT], data[STREET])
+    player_raised_number = data[player_base(data[NEXT_PLAYER]) + RAISE_NUM]
+    return data[AGREE_AMOUNT] < raise_limit and player_raised_number < 4
+
+  @classmethod
+  def __shuffle_deck(self, state):
+    data = state.data
+    if data[CHEAT]: return
+    deck_ids = data[DECK:DECK+data[DECK_NUM]].tolist()
+    state.rng.shuffle(deck_ids)
+    data[DECK:DECK+data[DECK_NUM]] = array("q", deck_ids)
+
+  @classmethod
+  def __correct_ante(self, data, ante_amount):
+    if ante_amount == 0: return
+    for pos in range(data[PLAYER_NUM]):
+      base = player_base(pos)
+      if data[base+PAY_STATUS] == PayInfo.FOLDED: continue
+      self.__collect_bet(data, base, ante_amount)
+      data[base+PAY_AMOUNT] += ante_amount
+      self.__add_action_history(data, pos, Const.Action.ANTE, ante_amount)
+
+  @classmethod
+  def __correct_blind(self, data, sb_amount):
+    self.__blind_transaction(data, data[SB_POS], Const.Action.SMALL_BLIND, sb_amount, sb_amount)
+    self.__blind_transaction(data, data[BB_POS], Const.Action.BIG_BLIND, sb_amount*2, sb_amount)
+
+  @classmethod
+  def __blind_transaction(self, data, pos, kind, blind_amount, sb_amount):
+    base = player_base(pos)
+    self.__collect_bet(data, base, blind_amount)
+    self.__add_action_history(data, pos, kind, blind_amount, add_amount=sb_amount)
+    data[base+PAY_AMOUNT] += blind_amount
+
+  @classmethod
+  def __deal_holecard(self, data):
+    for pos in range(data[PLAYER_NUM]):
+      base = player_base(pos) + HOLE_CARD
+      if data[base] != 0: raise ValueError("Hole card is already set")
+      data[base] = self.__draw_card_id(data)
+      data[base+1] = self.__draw_card_id(data)
+
+  @classmethod
+  def __start_street(self, state):
+    data = state.data
+    data[NEXT_PLAYER] = self.__next_ask_waiting_player_pos(data, data[SB_POS]-1)
+    street = data[STREET]
+    if street == Const.Street.PREFLOP:
+      for _ in range(2):
+        if data[NEXT_PLAYER] != NOT_FOUND:
+          data[NEXT_PLAYER] = self.__next_ask_waiting_player_pos(data, data[NEXT_PLAYER])
+    elif street == Const.Street.FLOP:
+      for _ in range(3): self.__add_community_card_id(data, self.__draw_card_id(data))
+    elif street in (Const.Street.TURN, Const.Street.RIVER):
+      self.__add_community_card_id(data, self.__draw_card_id(data))
+    elif street == Const.Street.SHOWDOWN:
+      return self.__showdown(state)
+    else:
+      raise ValueError("Street is already finished [street = %d]" % street)
+    self.__forward_street(state)
+
+  @classmethod
+  def __forward_street(self, state):
+    data = state.data
+    if self.__count_ask_wait_players(data) <= 1:
+      data[STREET] += 1
+      self.__start_street(state)
+
+  @classmethod
+  def __showdown(self, state):
+    data = state.data
+    for pos, prize in enumerate(self.__calc_prize_distribution(data)):
+      data[player_base(pos) + STACK] += prize
+    self.__reset(state)
+    data[STREET] += 1
+
+  @classmethod
+  def __calc_prize_distribution(self, data):
+    player_num = data[PLAYER_NUM]
+    bases = [player_base(pos) for pos in range(player_num)]
+    statuses = [data[base+PAY_STATUS] for base in bases]
+    community_ids = data[COMMUNITY:COMMUNITY+data[COMMUNITY_NUM]].tolist()
+    scores = dict((pos, HandEvaluator.eval_hand_ids(data[bases[pos]+HOLE_CARD:bases[pos]+HOLE_CARD+2].tolist(), community_ids))
+        for pos in range(player_num) if statuses[pos] != PayInfo.FOLDED)
+    pots = GameEvaluator.calc_pots([data[base+PAY_AMOUNT] for base in bases], statuses)
+    prize_map = GameEvaluator.calc_prize_distribution(pots, scores, player_num)
+    return [prize_map[pos] for pos in range(player_num)]
+
+  @classmethod
+  def __reset(self, state):
+    data = state.data
+    deck_ids = list(state.cheat_card_ids[::-1]) if data[CHEAT] else list(range(1, 53))
+    data[DECK:DECK+len(deck_ids)] = array("q", deck_ids)
+    data[DECK_NUM] = len(deck_ids)
+    data[COMMUNITY_NUM] = 0
+    for pos in range(data[PLAYER_NUM]):
+      base = player_base(pos)
+      data[base+PAY_AMOUNT:base+PLAYER_SIZE] = array("q", [0, PayInfo.PAY_TILL_END, 0, 0, NO_ACTION, 0, 0, 0])
+    data[AGREE_AMOUNT] = 0
+    data[LAST_ADD_AMOUNT] = NO_RAISE
+    data[SAVED_STREET_FLG] = 0
+    del data[player_base(data[PLAYER_NUM]):]
+
+  @classmethod
+  def __update_state_by_action(self, data, action):
+    pos = data[NEXT_PLAYER]
+    base = player_base(pos)
+    current_amount = data[AGREE_AMOUNT]
+    if action == "raise":
+      amount = current_amount + ActionChecker.round_raise_amount(data[SMALL_BLIND_AMOUNT], data[STREET])[0]
+    elif action == "call":
+      amount = current_amount
+    else:
+      amount = 0
+    if self.__is_allin(data, base, action, amount):
+      amount = data[base+STACK] + data[base+PAID_SUM]
+    elif self.__is_illegal(data, base, action, amount):
+      action, amount = "fold", 0
+    if self.__is_allin(data, base, action, amount):
+      data[base+PAY_STATUS] = PayInfo.ALLIN
+    self.__accept_action(data, pos, action, amount)
+
+  @classmethod
+  def __accept_action(self, data, pos, action, bet_amount):
+    base = player_base(pos)
+    if action == 'call':
+      paid = self.__chip_transaction(data, base, bet_amount)
+      self.__add_action_history(data, pos, Const.Action.CALL, bet_amount, paid)
+    elif action == 'raise':
+      paid = self.__chip_transaction(data, base, bet_amount)
+      add_amount = bet_amount - data[AGREE_AMOUNT]
+      self.__add_action_history(data, pos, Const.Action.RAISE, bet_amount, paid, add_amount)
+    elif action == 'fold':
+      self.__add_action_history(data, pos, Const.Action.FOLD)
+      data[base+PAY_STATUS] = PayInfo.FOLDED
+    else:
+      raise ValueError("Unexpected action %s received" % action)
+
+  @classmethod
+  def __is_allin(self, data, base, action, bet_amount):
+    if action == 'call':
+      return bet_amount >= data[base+STACK] + data[base+PAID_SUM]
+    elif action == 'raise':
+      return bet_amount == data[base+STACK] + data[base+PAID_SUM]
+    else:
+      return False
+
+  @classmethod
+  def __is_illegal(self, data, base, action, amount):
+    short_of_money = data[base+STACK] < amount - data[base+PAID_SUM]
+    if action == 'call':
+      return short_of_money or amount != data[AGREE_AMOUNT]
+    elif action == 'raise':
+      if data[LAST_ADD_AMOUNT] == NO_RAISE:
+        min_raise_amount = data[SMALL_BLIND_AMOUNT] * 2
+      else:
+        min_raise_amount = data[AGREE_AMOUNT] + data[LAST_ADD_AMOUNT]
+      return short_of_money or min_raise_amount > amount
+    return False
+
+  @classmethod
+  def __chip_transaction(self, data, base, bet_amount):
+    need_amount = bet_amount - data[base+PAID_SUM]
+    self.__collect_bet(data, base, need_amount)
+    data[base+PAY_AMOUNT] += need_amount
+    return need_amount
+
+  @classmethod
+  def __collect_bet(self, data, base, amount):
+    if data[base+STACK] < amount:
+      raise ValueError("Failed to collect %d chips. Because he has only %d chips" % (amount, data[base+STACK]))
+    data[base+STACK] -= amount
+
+  # Player.add_action_history plus what ActionChecker reads from the histories
+  @classmethod
+  def __add_action_history(self, data, pos, kind, amount=0, paid=0, add_amount=0):
+    base = player_base(pos)
+    if data[base+ACTION_NUM] == 0: data[base+FIRST_ACTION] = kind
+    data[base+ACTION_NUM] += 1
+    if kind != Const.Action.FOLD and kind != Const.Action.ANTE:
+      data[base+PAID_SUM] = amount
+    if kind == Const.Action.RAISE:
+      data[base+RAISE_NUM] += 1
+    if kind in (Const.Action.RAISE, Const.Action.SMALL_BLIND, Const.Action.BIG_BLIND) and \
+        (data[LAST_ADD_AMOUNT] == NO_RAISE or amount > data[AGREE_AMOUNT]):
+      data[AGREE_AMOUNT] = amount
+      data[LAST_ADD_AMOUNT] = add_amount
+    data.extend((data[STREET], pos, kind, amount, paid, add_amount))
+
+  @classmethod
+  def __save_street_action_histories(self, data):
+    for pos in range(data[PLAYER_NUM]):
+      base = player_base(pos)
+      data[base+PAID_SUM] = 0
+      data[base+ACTION_NUM] = 0
+      data[base+FIRST_ACTION] = NO_ACTION
+    data[SAVED_STREET_FLG] |= 1 << data[STREET]
+    data[AGREE_AMOUNT] = 0
+    data[LAST_ADD_AMOUNT] = NO_RAISE
+
+  @classmethod
+  def __is_everyone_agreed(self, data):
+    if self.__count_active_players(data) == 0:
+      raise ValueError("[__is_everyone_agreed] no-active-players!!")
+    player_num = data[PLAYER_NUM]
+    next_player_pos = self.__next_ask_waiting_player_pos(data, data[NEXT_PLAYER])
+    max_pay = max([data[player_base(pos) + PAID_SUM] for pos in range(player_num)])
+    everyone_agreed = all([self.__is_agreed(data, max_pay, pos) for pos in range(player_num)])
+    lonely_player = self.__count_active_players(data) == 1
+    no_need_to_ask = self.__count_ask_wait_players(data) == 1 and next_player_pos != NOT_FOUND and\
+        data[player_base(next_player_pos) + PAID_SUM] == max_pay
+    return everyone_agreed or lonely_player or no_need_to_ask
+
+  @classmethod
+  def __is_agreed(self, data, max_pay, pos):
+    base = player_base(pos)
+    # BigBlind should be asked action at least once
+    is_preflop = not data[SAVED_STREET_FLG] & 1
+    bb_ask_once = data[base+ACTION_NUM] == 1 and data[base+FIRST_ACTION] == Const.Action.BIG_BLIND
+    bb_ask_check = not is_preflop or not bb_ask_once
+    return (bb_ask_check and data[base+PAID_SUM] == max_pay and data[base+ACTION_NUM] != 0)\
+        or data[base+PAY_STATUS] in (PayInfo.FOLDED, PayInfo.ALLIN)
+
+  @classmethod
+  def __next_ask_waiting_player_pos(self, data, start_pos):
+    player_num = data[PLAYER_NUM]
+    for i in range(1, player_num+1):
+      pos = (start_pos + i) % player_num
+      if data[player_base(pos) + PAY_STATUS] == PayInfo.PAY_TILL_END: return pos
+    return NOT_FOUND
+
+  @classmethod
+  def __count_active_players(self, data):
+    return len([pos for pos in range(data[PLAYER_NUM]) if data[player_base(pos) + PAY_STATUS] != PayInfo.FOLDED])
+
+  @classmethod
+  def __count_ask_wait_players(self, data):
+    return len([pos for pos in range(data[PLAYER_NUM]) if data[player_base(pos) + PAY_STATUS] == PayInfo.PAY_TILL_END])
+
+  @classmethod
+  def __draw_card_id(self, data):
+    data[DECK_NUM] -= 1
+    return data[DECK + data[DECK_NUM]]
+
+  @classmethod
+  def __add_community_card_id(self, data, card_id):
+    if data[COMMUNITY_NUM] == 5:
+      raise ValueError("Community card is already full")
+    data[COMMUNITY + data[COMMUNITY_NUM]] = card_id
+    data[COMMUNITY_NUM] += 1
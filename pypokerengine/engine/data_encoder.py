@@ -1,5 +1,3 @@
-from functools import reduce
-
 from pypokerengine.engine.pay_info import PayInfo
 from pypokerengine.engine.poker_constants import PokerConstants as Const
 from pypokerengine.engine.game_evaluator import GameEvaluator
@@ -77,13 +75,17 @@ class DataEncoder:
         "street": self.__street_to_str(street)
         }
 
+  # Saved streets never change, so their ordered histories are cached
+  # (see __fetch_saved_street_histories) and only the current street is
+  # ordered on each call.
   @classmethod
   def encode_action_histories(self, table):
-    all_street_histories = [[player.round_action_histories[street] for player in table.seats.players] for street in range(4)]
+    players, sb_pos = table.seats.players, table.sb_pos()
+    all_street_histories = [[player.round_action_histories[street] for player in players] for street in range(4)]
     past_street_histories = [histories for histories in all_street_histories if any([e is not None for e in histories])]
-    current_street_histories = [player.action_histories for player in table.seats.players]
-    street_histories = past_street_histories + [current_street_histories]
-    street_histories = [self.__order_histories(table.sb_pos(), histories) for histories in street_histories]
+    current_street_histories = [player.action_histories for player in players]
+    street_histories = [self.__fetch_saved_street_histories(sb_pos, histories) for histories in past_street_histories]
+    street_histories.append(self.__order_histories(sb_pos, current_street_histories))
     street_name = ["preflop", "flop", "turn", "river"]
     action_histories = { name:histories for name, histories in zip(street_name, street_histories) }
     return { "action_histories": action_histories }
@@ -136,19 +138,28 @@ class DataEncoder:
   def __encode_players(self, players):
     return [self.encode_player(player) for player in players]
 
+  # Histories of one street interleaved as i-th action of each player, from start_pos
   @classmethod
   def __order_histories(self, start_pos, player_histories):
-    ordered_player_histories = [player_histories[(start_pos+i)%len(player_histories)] for i in range(len(player_histories))]
-    all_player_histories = [histories[::] for histories in ordered_player_histories]
-    max_len = max([len(h) for h in all_player_histories])
-    unified_histories = [self.__unify_length(max_len, l) for l in all_player_histories]
-    ordered_histories = reduce(lambda acc, zp: acc + list(zp), zip(*unified_histories), [])
-    return [history for history in ordered_histories if not history is None]
+    start_pos = start_pos % len(player_histories)
+    ordered_player_histories = player_histories[start_pos:] + player_histories[:start_pos]
+    max_len = max([len(h) for h in ordered_player_histories])
+    return [histories[i] for i in range(max_len) for histories in ordered_player_histories if i < len(histories)]
 
+  # Keyed by the identity of the per player lists, which clone() shares.
+  # Each call returns a fresh list so that callers never share one.
   @classmethod
-  def __unify_length(self, max_len, lst):
-    for _ in range(max_len-len(lst)):
-      lst.append(None)
-    return lst
+  def __fetch_saved_street_histories(self, start_pos, player_histories):
+    key = (start_pos,) + tuple([id(histories) for histories in player_histories])
+    lengths = [len(histories) for histories in player_histories]
+    cached = self.__saved_street_cache.get(key)
+    if cached is None or any([a is not b for a, b in zip(cached[0], player_histories)]) or cached[1] != lengths:
+      if len(self.__saved_street_cache) >= self.__SAVED_STREET_CACHE_SIZE: self.__saved_street_cache.clear()
+      cached = (player_histories, lengths, self.__order_histories(start_pos, player_histories))
+      self.__saved_street_cache[key] = cached
+    return cached[2][::]
+
+  __SAVED_STREET_CACHE_SIZE = 256
+  __saved_street_cache = {}
 
 
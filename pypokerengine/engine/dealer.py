@@ -1,5 +1,6 @@
 import random
 import pprint
+import time
 from collections import OrderedDict
 
 from pypokerengine.engine.poker_constants import PokerConstants as Const
@@ -7,17 +8,25 @@ from pypokerengine.engine.table import Table
 from pypokerengine.engine.player import Player
 from pypokerengine.engine.round_manager import RoundManager
 from pypokerengine.engine.message_builder import MessageBuilder
+from pypokerengine.engine.pay_info import PayInfo
+from pypokerengine.engine.compact_game_state import CompactGameState, player_base,\
+    DEALER_BTN, SB_POS, BB_POS, PLAYER_NUM, STACK, PAY_STATUS
+from pypokerengine.engine.compact_round_manager import CompactRoundManager
+from pypokerengine.utils.latency import ThinkTimeRecorder, timeout_count
 
 class Dealer:
 
-  def __init__(self, small_blind_amount=None, initial_stack=None, ante=None):
+  # rng (random module by default, or a random.Random) draws the uuids and shuffles the deck
+  def __init__(self, small_blind_amount=None, initial_stack=None, ante=None, rng=random):
     self.small_blind_amount = small_blind_amount
     self.ante = ante if ante else 0
     self.initial_stack = initial_stack
+    self.rng = rng
     self.uuid_list = self.__generate_uuid_list()
     self.message_handler = MessageHandler()
     self.message_summarizer = MessageSummarizer(verbose=0)
-    self.table = Table()
+    self.think_time = ThinkTimeRecorder()
+    self.table = Table(rng=rng)
     self.blind_structure = {}
 
   def register_player(self, player_name, algorithm):
@@ -29,7 +38,11 @@ class Dealer:
   def set_verbose(self, verbose):
       self.message_summarizer.verbose = verbose
 
-  def start_game(self, max_round):
+  # headless=True plays the game on CompactGameState with players of
+  # BaseHeadlessPlayer. No message is built or summarized and players are
+  # only asked for their actions.
+  def start_game(self, max_round, headless=False):
+    if headless: return self.__start_headless_game(max_round)
     table = self.table
     self.__notify_game_start(max_round)
     ante, sb_amount = self.ante, self.small_blind_amount
@@ -50,19 +63,30 @@ class Dealer:
     return self.__generate_game_result(max_round, table.seats)
   
   def play_round(self, round_count, blind_amount, ante, table):
-    state, msgs = RoundManager.start_new_round(round_count, blind_amount, ante, table)
+    state, msgs = RoundManager.start_new_round(round_count, blind_amount, ante, table, inplace=True)
     while True:
       #TODO:update the play_round
       self.__message_check(msgs, state["street"])
       if state["street"] != Const.Street.FINISHED:  # continue the round
-        action = self.__publish_messages(msgs)
-        state, msgs = RoundManager.apply_action(state, action)
+        action = self.__publish_messages(msgs, state["street"])
+        state, msgs = RoundManager.apply_action(state, action, inplace=True)
       else:  # finish the round after publish round result
         self.__publish_messages(msgs)
         break
     return state["table"]
 
 
+  def play_headless_round(self, round_count, blind_amount, ante, state, algorithms):
+    state = CompactRoundManager.start_new_round(round_count, blind_amount, ante, state, inplace=True)
+    while state.street != Const.Street.FINISHED:
+      legal_actions = CompactRoundManager.legal_action_names(state)
+      start = time.perf_counter()
+      action = algorithms[state.next_player].declare_action(state, legal_actions)
+      self.think_time.record(state.uuids[state.next_player], state.street, time.perf_counter() - start)
+      if action not in legal_actions: action = "fold"
+      state = CompactRoundManager.apply_action(state, action, inplace=True)
+    return state
+
   def set_small_blind_amount(self, amount):
     self.small_blind_amount = amount
 
@@ -81,6 +105,55 @@ class Dealer:
       ante, sb_amount = update_info["ante"], update_info["small_blind"]
     return ante, sb_amount
 
+  def __start_headless_game(self, max_round):
+    state = CompactGameState.from_table(self.table)
+    algorithms = [self.message_handler.algo_owner_map[uuid] for uuid in state.uuids]
+    ante, sb_amount = self.ante, self.small_blind_amount
+    for round_count in range(1, max_round+1):
+      if round_count in self.blind_structure:
+        update_info = self.blind_structure[round_count]
+        ante, sb_amount = update_info["ante"], update_info["small_blind"]
+      self.__exclude_short_of_money_players_headless(state.data, ante, sb_amount)
+      if self.__is_headless_game_finished(state.data): break
+      state = self.play_headless_round(round_count, sb_amount, ante, state, algorithms)
+      self.__shift_dealer_btn_headless(state.data)
+    seats = state.to_game_state()["table"].seats
+    return MessageBuilder.build_game_result_message(self.__gen_config(max_round), seats)
+
+  # Same exclusion as __exclude_short_of_money_players on CompactGameState.data
+  def __exclude_short_of_money_players_headless(self, data, ante, sb_amount):
+    player_num = data[PLAYER_NUM]
+    stack = lambda pos: data[player_base(pos) + STACK]
+    too_poor = set([pos for pos in range(player_num) if stack(pos) < ante])
+    if stack(data[DEALER_BTN]) == 0: self.__shift_dealer_btn_headless(data)
+
+    search_targets = [(data[DEALER_BTN] + 1 + i) % player_num for i in range(player_num)]
+    sb_pos = next((pos for pos in search_targets if stack(pos) >= sb_amount + ante))
+    sb_relative_pos = search_targets.index(sb_pos)
+    too_poor.update(search_targets[:sb_relative_pos])
+    search_targets = search_targets[sb_relative_pos+1:]
+    bb_pos = next((pos for pos in search_targets if stack(pos) >= sb_amount*2 + ante), sb_pos)
+    if sb_pos == bb_pos:
+      too_poor.update([pos for pos in range(player_num) if pos != bb_pos])
+    else:
+      for pos in search_targets[:search_targets.index(bb_pos)]: data[player_base(pos) + STACK] = 0
+
+    for pos in too_poor: data[player_base(pos) + PAY_STATUS] = PayInfo.FOLDED
+    data[SB_POS], data[BB_POS] = sb_pos, bb_pos
+    if stack(data[DEALER_BTN]) == 0: self.__shift_dealer_btn_headless(data)
+
+  # Table.shift_dealer_btn
+  def __shift_dealer_btn_headless(self, data):
+    player_num = data[PLAYER_NUM]
+    for i in range(1, player_num+1):
+      base = player_base((data[DEALER_BTN] + i) % player_num)
+      if data[base+PAY_STATUS] != PayInfo.FOLDED and data[base+STACK] != 0:
+        data[DEALER_BTN] = (data[DEALER_BTN] + i) % player_num
+        return
+
+  def __is_headless_game_finished(self, data):
+    return len([pos for pos in range(data[PLAYER_NUM]) if data[player_base(pos) + PAY_STATUS] != PayInfo.FOLDED]) == 1
+
   def __register_algorithm_to_message_handler(self, uuid, algorithm):
     self.message_handler.register_algorithm(uuid, algorithm)
 
@@ -106,11 +179,19 @@ class Dealer:
     if invalid:
       raise Exception("Last message is not ask type. : %s" % msgs)
 
-  def __publish_messages(self, msgs):
+  def __publish_messages(self, msgs, street=None):
     for address, msg in msgs[:-1]:
       self.message_handler.process_message(address, msg)
     self.message_summarizer.summarize_messages(msgs)
-    return self.message_handler.process_message(*msgs[-1])
+    address, msg = msgs[-1]
+    if msg["type"] != "ask": return self.message_handler.process_message(address, msg)
+    # think time of the asked player, timeouts as reported by its deadline wrapper
+    algorithm = self.message_handler.algo_owner_map[address]
+    timeouts = timeout_count(algorithm)
+    start = time.perf_counter()
+    action = self.message_handler.process_message(address, msg)
+    self.think_time.record(address, street, time.perf_counter() - start, timeout_count(algorithm) > timeouts)
+    return action
 
   def __exclude_short_of_money_players(self, table, ante, sb_amount):
     # print("Exclude Player (entry), ante = "+str(ante)+", sb = "+str(sb_amount))
@@ -200,7 +281,7 @@ class Dealer:
   def __generate_uuid(self):
     uuid_size = 22
     chars = [chr(code) for code in range(97,123)]
-    return "".join([random.choice(chars) for _ in range(uuid_size)])
+    return "".join([self.rng.choice(chars) for _ in range(uuid_size)])
 
 class MessageHandler:
 
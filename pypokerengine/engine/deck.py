@@ -3,19 +3,30 @@ from functools import reduce
 from pypokerengine.engine.card import Card
 import random
 
+# Cards in the deck are held as card ids (see Card.to_id).
+# Card objects are only created when a card is drawn through draw_card(s).
+# rng (random module by default, or a random.Random) is used by shuffle and
+# shared with clones. It is not serialized: pass it again to deserialize.
 class Deck:
 
-  def __init__(self, deck_ids=None, cheat=False, cheat_card_ids=[]):
+  def __init__(self, deck_ids=None, cheat=False, cheat_card_ids=[], rng=random):
+    self.rng = rng
     self.cheat = cheat
     self.cheat_card_ids = cheat_card_ids
-    self.deck = [Card.from_id(cid) for cid in deck_ids] if deck_ids else self.__setup()
+    self.deck = list(deck_ids) if deck_ids else self.__setup()
 
   def draw_card(self):
-    return self.deck.pop()
+    return Card.from_id(self.deck.pop())
 
   def draw_cards(self, num):
     return reduce(lambda acc, _: acc + [self.draw_card()], range(num), [])
 
+  def draw_card_id(self):
+    return self.deck.pop()
+
+  def draw_card_ids(self, num):
+    return [self.deck.pop() for _ in range(num)]
+
   def size(self):
     return len(self.deck)
 
@@ -24,24 +35,31 @@ class Deck:
 
   def shuffle(self):
     if not self.cheat:
-      random.shuffle(self.deck)
+      self.rng.shuffle(self.deck)
+
+  def clone(self):
+    deck = Deck.__new__(Deck)
+    deck.rng = self.rng
+    deck.cheat = self.cheat
+    deck.cheat_card_ids = self.cheat_card_ids
+    deck.deck = self.deck[::]
+    return deck
 
   # serialize format : [cheat_flg, chat_card_ids, deck_card_ids]
   def serialize(self):
-    return [self.cheat, self.cheat_card_ids, [card.to_id() for card in self.deck]]
+    return [self.cheat, self.cheat_card_ids, self.deck[::]]
 
   @classmethod
-  def deserialize(self, serial):
+  def deserialize(self, serial, rng=random):
     cheat, cheat_card_ids, deck_ids = serial
-    return self(deck_ids=deck_ids, cheat=cheat, cheat_card_ids=cheat_card_ids)
+    return self(deck_ids=deck_ids, cheat=cheat, cheat_card_ids=cheat_card_ids, rng=rng)
 
   def __setup(self):
     return self.__setup_cheat_deck() if self.cheat else self.__setup_52_cards()
 
   def __setup_52_cards(self):
-    return [Card.from_id(cid) for cid in range(1,53)]
+    return list(range(1,53))
 
   def __setup_cheat_deck(self):
-    cards = [Card.from_id(cid) for cid in self.cheat_card_ids]
-    return cards[::-1]
+    return self.cheat_card_ids[::-1]
 
@@ -1,108 +1,76 @@
-from functools import reduce
-from itertools import groupby
-
 from pypokerengine.engine.hand_evaluator import HandEvaluator
 from pypokerengine.engine.pay_info import PayInfo
 
 class GameEvaluator:
 
+  # Each active hand is evaluated once and the scores are shared by
+  # winners, hand info and the prize of every pot.
   @classmethod
   def judge(self, table):
-    winners = self.__find_winners_from(table.get_community_card(), table.seats.players)
-    hand_info = self.__gen_hand_info_if_needed(table.seats.players, table.get_community_card())
-    prize_map = self.__calc_prize_distribution(table.get_community_card(), table.seats.players)
+    players = table.seats.players
+    scores = self.__score_active_players(table.get_community_card_ids(), players)
+    winners = [players[pos] for pos in self.__find_winner_pos(scores, sorted(scores))]
+    hand_info = self.__gen_hand_info_if_needed(players, table.get_community_card(), scores)
+    pots = self.calc_pots([p.pay_info.amount for p in players], [p.pay_info.status for p in players])
+    prize_map = self.calc_prize_distribution(pots, scores, len(players))
     return winners, hand_info, prize_map
 
   @classmethod
   def create_pot(self, players):
-    side_pots = self.__get_side_pots(players)
-    main_pot = self.__get_main_pot(players, side_pots)
-    return side_pots + [main_pot]
-
-
-  @classmethod
-  def __calc_prize_distribution(self, community_card, players):
-    prize_map = self.__create_prize_map(len(players))
-    pots = self.create_pot(players)
-    for pot in pots:
-      winners = self.__find_winners_from(community_card, pot["eligibles"])
-      prize = int(pot["amount"] / len(winners))
-      for winner in winners:
-        prize_map[players.index(winner)] += prize
+    pots = self.calc_pots([p.pay_info.amount for p in players], [p.pay_info.status for p in players])
+    return [{ "amount": amount, "eligibles": [players[pos] for pos in eligibles] } for amount, eligibles in pots]
+
+  # Pots as (amount, eligible player positions): side pots in ascending order
+  # of all-in amount, then the main pot. Contributions are sorted once and
+  # all pots are built in one sweep over them.
+  # Main pot eligibles are the players who paid the most, folded or not.
+  @classmethod
+  def calc_pots(self, pay_amounts, statuses):
+    player_num = len(pay_amounts)
+    order = sorted(range(player_num), key=lambda pos: pay_amounts[pos])
+    pots, pots_sum = [], 0
+    below_idx = below_sum = 0  # players in order[:below_idx] paid less than the all-in amount
+    for pos in order:
+      if statuses[pos] != PayInfo.ALLIN: continue
+      allin_amount = pay_amounts[pos]
+      while pay_amounts[order[below_idx]] < allin_amount:
+        below_sum += pay_amounts[order[below_idx]]
+        below_idx += 1
+      amount = below_sum + allin_amount * (player_num - below_idx) - pots_sum
+      eligibles = [p for p in range(player_num) if pay_amounts[p] >= allin_amount and statuses[p] != PayInfo.FOLDED]
+      pots.append((amount, eligibles))
+      pots_sum += amount
+    max_pay = max(pay_amounts)
+    pots.append((sum(pay_amounts) - pots_sum, [pos for pos in range(player_num) if pay_amounts[pos] == max_pay]))
+    return pots
+
+  # scores : {player pos: hand score} of the active players
+  # A pot whose eligible players all folded goes with the previous pot
+  # (to all active players for the first one).
+  @classmethod
+  def calc_prize_distribution(self, pots, scores, player_num):
+    prize_map = dict((pos, 0) for pos in range(player_num))
+    contenders = sorted(scores)
+    for amount, eligibles in pots:
+      contenders = [pos for pos in eligibles if pos in scores] or contenders
+      winners = self.__find_winner_pos(scores, contenders)
+      prize = int(amount / len(winners))
+      for pos in winners:
+        prize_map[pos] += prize
     return prize_map
 
   @classmethod
-  def __create_prize_map(self, player_num):
-    def update(d, other): d.update(other); return d
-    return reduce(update, [{i:0} for i in range(player_num)], {})
-
-  @classmethod
-  def __find_winners_from(self, community_card, players):
-    score_player = lambda player: HandEvaluator.eval_hand(player.hole_card, community_card)
-
-    active_players = [player for player in players if player.is_active()]
-    scores = [score_player(player) for player in active_players]
-    best_score = max(scores)
-    score_with_players = [(score, player) for score, player in zip(scores, active_players)]
-    winners = [s_p[1] for s_p in score_with_players if s_p[0] == best_score]
-    return winners
-
-  @classmethod
-  def __gen_hand_info_if_needed(self, players, community):
-    active_players = [player for player in players if player.is_active()]
-    gen_hand_info = lambda player: { "uuid": player.uuid, "hand" : HandEvaluator.gen_hand_rank_info(player.hole_card, community)}
-    return [] if len(active_players) == 1 else [gen_hand_info(player) for player in active_players]
-
-  @classmethod
-  def __get_main_pot(self, players, sidepots):
-    max_pay = max([pay.amount for pay in self.__get_payinfo(players)])
-    return {
-        "amount": self.__get_players_pay_sum(players) - self.__get_sidepots_sum(sidepots),
-        "eligibles": [player for player in players if player.pay_info.amount == max_pay]
-    }
-
-  @classmethod
-  def __get_players_pay_sum(self, players):
-    return sum([pay.amount for pay in self.__get_payinfo(players)])
-
-  @classmethod
-  def __get_side_pots(self, players):
-    pay_amounts = [payinfo.amount for payinfo in self.__fetch_allin_payinfo(players)]
-    gen_sidepots = lambda sidepots, allin_amount: sidepots + [self.__create_sidepot(players, sidepots, allin_amount)]
-    return reduce(gen_sidepots, pay_amounts, [])
-
-  @classmethod
-  def __create_sidepot(self, players, smaller_side_pots, allin_amount):
-    return {
-        "amount": self.__calc_sidepot_size(players, smaller_side_pots, allin_amount),
-        "eligibles" : self.__select_eligibles(players, allin_amount)
-    }
-
-  @classmethod
-  def __calc_sidepot_size(self, players, smaller_side_pots, allin_amount):
-    add_chip_for_pot = lambda pot, player: pot + min(allin_amount, player.pay_info.amount)
-    target_pot_size = reduce(add_chip_for_pot, players, 0)
-    return target_pot_size - self.__get_sidepots_sum(smaller_side_pots)
-
-  @classmethod
-  def __get_sidepots_sum(self, sidepots):
-    return reduce(lambda sum_, sidepot: sum_ + sidepot["amount"], sidepots, 0)
-
-  @classmethod
-  def __select_eligibles(self, players, allin_amount):
-    return [player for player in players if self.__is_eligible(player, allin_amount)]
-
-  @classmethod
-  def __is_eligible(self, player, allin_amount):
-    return player.pay_info.amount >= allin_amount and \
-        player.pay_info.status != PayInfo.FOLDED
+  def __score_active_players(self, community_card, players):
+    return dict((pos, HandEvaluator.eval_hand_ids(player.hole_card_ids, community_card))
+        for pos, player in enumerate(players) if player.is_active())
 
   @classmethod
-  def __fetch_allin_payinfo(self, players):
-    payinfo = self.__get_payinfo(players)
-    allin_info = [info for info in payinfo if info.status == PayInfo.ALLIN]
-    return sorted(allin_info, key=lambda info: info.amount)
+  def __find_winner_pos(self, scores, positions):
+    best_score = max([scores[pos] for pos in positions])
+    return [pos for pos in positions if scores[pos] == best_score]
 
   @classmethod
-  def __get_payinfo(self, players):
-    return [player.pay_info for player in players]
+  def __gen_hand_info_if_needed(self, players, community, scores):
+    gen_hand_info = lambda pos: { "uuid": players[pos].uuid,
+        "hand" : HandEvaluator.gen_hand_rank_info_from_score(players[pos].hole_card, scores[pos]) }
+    return [] if len(scores) == 1 else [gen_hand_info(pos) for pos in sorted(scores)]
@@ -1,5 +1,5 @@
-from functools import reduce
-from itertools import groupby
+from pypokerengine.engine.card import Card
+from pypokerengine.engine.hand_rank_table import RANK_KEY, ID_RANK, ID_RANK_KEY, ID_SUIT_BIT, ID_SUIT_COUNT, load_tables
 
 class HandEvaluator:
 
@@ -27,7 +27,11 @@ class HandEvaluator:
 
   @classmethod
   def gen_hand_rank_info(self, hole, community):
-    hand = self.eval_hand(hole, community)
+    return self.gen_hand_rank_info_from_score(hole, self.eval_hand(hole, community))
+
+  # Same as gen_hand_rank_info when hand is eval_hand(hole, community)
+  @classmethod
+  def gen_hand_rank_info_from_score(self, hole, hand):
     row_strength = self.__mask_hand_strength(hand)
     strength = self.HAND_STRENGTH_MAP[row_strength]
     hand_high = self.__mask_hand_high_rank(hand)
@@ -50,10 +54,28 @@ class HandEvaluator:
 
   @classmethod
   def eval_hand(self, hole, community):
-    ranks = sorted([card.rank for card in hole])
-    hole_flg = ranks[1] << 4 | ranks[0]
-    hand_flg = self.__calc_hand_info_flg(hole, community) << 8
-    return hand_flg | hole_flg
+    high, low = hole[0].rank, hole[1].rank
+    if high < low: high, low = low, high
+    hole_flg = high << 4 | low
+    hand_flg = self.__calc_hand_info_flg(hole + community) or hole_flg
+    return hand_flg << 8 | hole_flg
+
+  # Same as eval_hand but hole and community are lists of card ids (see Card.to_id)
+  @classmethod
+  def eval_hand_ids(self, hole, community):
+    high, low = ID_RANK[hole[0]], ID_RANK[hole[1]]
+    if high < low: high, low = low, high
+    hole_flg = high << 4 | low
+    hand_flg = self.__calc_hand_info_flg_from_ids(hole + community) or hole_flg
+    return hand_flg << 8 | hole_flg
+
+  # Vectorized eval_hand over card ids (see Card.to_id).
+  # holes: (N, 2) array, communities: (N, 0-5) array. Returns (N,) int64 array.
+  # Requires numpy.
+  @classmethod
+  def eval_hands_batch(self, holes, communities):
+    from pypokerengine.engine.hand_evaluator_batch import eval_hands_batch
+    return eval_hands_batch(holes, communities)
 
   # Return Format
   # [Bit flg of hand][rank1(4bit)][rank2(4bit)]
@@ -67,172 +89,44 @@ class HandEvaluator:
   #       FullHouse of rank 3, 4   =>   100000 0011 0100
   #       FourCard of rank 2       =>  1000000 0010 0000
   #       straight flash of rank 7 => 10000000 0111 0000
+  # HighCard is returned as 0 here and filled with hole card ranks by eval_hand.
   @classmethod
-  def __calc_hand_info_flg(self, hole, community):
-    cards = hole + community
-    if self.__is_straightflash(cards): return self.STRAIGHTFLASH | self.__eval_straightflash(cards)
-    if self.__is_fourcard(cards): return self.FOURCARD | self.__eval_fourcard(cards)
-    if self.__is_fullhouse(cards): return self.FULLHOUSE | self.__eval_fullhouse(cards)
-    if self.__is_flash(cards): return self.FLASH | self.__eval_flash(cards)
-    if self.__is_straight(cards): return self.STRAIGHT | self.__eval_straight(cards)
-    if self.__is_threecard(cards): return self.THREECARD | self.__eval_threecard(cards)
-    if self.__is_twopair(cards): return self.TWOPAIR | self.__eval_twopair(cards)
-    if self.__is_onepair(cards): return self.ONEPAIR | (self.__eval_onepair(cards))
-    return self.__eval_holecard(hole)
-
-  @classmethod
-  def __eval_holecard(self, hole):
-    ranks = sorted([card.rank for card in hole])
-    return ranks[1] << 4 | ranks[0]
-
-  @classmethod
-  def __is_onepair(self, cards):
-    return self.__eval_onepair(cards) != 0
-
-  @classmethod
-  def __eval_onepair(self, cards):
-    rank = 0
-    memo = 0  # bit memo
-    for card in cards:
-      mask = 1 << card.rank
-      if memo & mask != 0: rank = max(rank, card.rank)
-      memo |= mask
-    return rank << 4
-
-  @classmethod
-  def __is_twopair(self, cards):
-    return len(self.__search_twopair(cards)) == 2
-
-  @classmethod
-  def __eval_twopair(self, cards):
-    ranks = self.__search_twopair(cards)
-    return ranks[0] << 4 | ranks[1]
-
-  @classmethod
-  def __search_twopair(self, cards):
-    ranks = []
-    memo = 0
+  def __calc_hand_info_flg(self, cards):
+    rank_table, flash_table = self.__tables or self.__load_tables()
+    rank_key = suit_count = 0
     for card in cards:
-      mask = 1 << card.rank
-      if memo & mask != 0: ranks.append(card.rank)
-      memo |= mask
-    return sorted(ranks)[::-1][:2]
-
-  @classmethod
-  def __is_threecard(self, cards):
-    return self.__search_threecard(cards) != -1
-
-  @classmethod
-  def __eval_threecard(self, cards):
-    return self.__search_threecard(cards) << 4
-
-  @classmethod
-  def __search_threecard(self, cards):
-    rank = -1
-    bit_memo = reduce(lambda memo,card: memo + (1 << (card.rank-1)*3), cards, 0)
-    for r in range(2, 15):
-      bit_memo >>= 3
-      count = bit_memo & 7
-      if count >= 3: rank = r
-    return rank
-
-  @classmethod
-  def __is_straight(self, cards):
-    return self.__search_straight(cards) != -1
-
-  @classmethod
-  def __eval_straight(self, cards):
-    return self.__search_straight(cards) << 4
-
-  @classmethod
-  def __search_straight(self, cards):
-    bit_memo = reduce(lambda memo, card: memo | 1 << card.rank, cards, 0)
-    rank = -1
-    straight_check = lambda acc, i: acc & (bit_memo >> (r+i) & 1) == 1
-    for r in range(2, 15):
-      if reduce(straight_check, range(5), True): rank = r
-    return rank
-
-  @classmethod
-  def __is_flash(self, cards):
-    return self.__search_flash(cards) != -1
-
-  @classmethod
-  def __eval_flash(self, cards):
-    return self.__search_flash(cards) << 4
-
-  @classmethod
-  def __search_flash(self, cards):
-    best_suit_rank = -1
-    fetch_suit = lambda card: card.suit
-    fetch_rank = lambda card: card.rank
-    for suit, group_obj in groupby(sorted(cards, key=fetch_suit), key=fetch_suit):
-      g = list(group_obj)
-      if len(g) >= 5:
-        max_rank_card = max(g, key=fetch_rank)
-        best_suit_rank = max(best_suit_rank, max_rank_card.rank)
-    return best_suit_rank
-
-  @classmethod
-  def __is_fullhouse(self, cards):
-    r1, r2 = self.__search_fullhouse(cards)
-    return r1 and r2
-
-  @classmethod
-  def __eval_fullhouse(self, cards):
-    r1, r2 = self.__search_fullhouse(cards)
-    return r1 << 4 | r2
-
-  @classmethod
-  def __search_fullhouse(self, cards):
-    fetch_rank = lambda card: card.rank
-    three_card_ranks, two_pair_ranks = [], []
-    for rank, group_obj in groupby(sorted(cards, key=fetch_rank), key=fetch_rank):
-      g = list(group_obj)
-      if len(g) >= 3:
-        three_card_ranks.append(rank)
-      if len(g) >= 2:
-        two_pair_ranks.append(rank)
-    two_pair_ranks = [rank for rank in two_pair_ranks if not rank in three_card_ranks]
-    if len(three_card_ranks) == 2:
-      two_pair_ranks.append(min(three_card_ranks))
-    max_ = lambda l: None if len(l)==0 else max(l)
-    return max_(three_card_ranks), max_(two_pair_ranks)
-
-  @classmethod
-  def __is_fourcard(self, cards):
-    return self.__eval_fourcard(cards) != 0
-
-  @classmethod
-  def __eval_fourcard(self, cards):
-    rank = self.__search_fourcard(cards)
-    return rank << 4
-
-  @classmethod
-  def __search_fourcard(self, cards):
-    fetch_rank = lambda card: card.rank
-    for rank, group_obj in groupby(sorted(cards, key=fetch_rank), key=fetch_rank):
-      g = list(group_obj)
-      if len(g) >= 4:
-        return rank
-    return 0
-
-  @classmethod
-  def __is_straightflash(self, cards):
-    return self.__search_straightflash(cards) != -1
-
-  @classmethod
-  def __eval_straightflash(self, cards):
-    return self.__search_straightflash(cards) << 4
-
-  @classmethod
-  def __search_straightflash(self, cards):
-    flash_cards = []
-    fetch_suit = lambda card: card.suit
-    for suit, group_obj in groupby(sorted(cards, key=fetch_suit), key=fetch_suit):
-      g = list(group_obj)
-      if len(g) >= 5: flash_cards = g
-    return self.__search_straight(flash_cards)
+      rank_key += RANK_KEY[card.rank]
+      suit_count += self.__SUIT_COUNT[card.suit]
+    if (suit_count + 0x3333) & 0x8888:  # some suit holds 5 or more cards
+      suit_mask = [0] * 17  # bit flg of ranks held in each suit, indexed by Card.CLUB ... Card.SPADE
+      for card in cards: suit_mask[card.suit] |= 1 << card.rank
+      for suit in self.__SUITS:
+        if suit_mask[suit] in flash_table: return flash_table[suit_mask[suit]]
+    return rank_table[rank_key]
+
+  @classmethod
+  def __calc_hand_info_flg_from_ids(self, card_ids):
+    rank_table, flash_table = self.__tables or self.__load_tables()
+    rank_key = suit_count = 0
+    for cid in card_ids:
+      rank_key += ID_RANK_KEY[cid]
+      suit_count += ID_SUIT_COUNT[cid]
+    if (suit_count + 0x3333) & 0x8888:  # some suit holds 5 or more cards
+      suit_bit = 0
+      for cid in card_ids: suit_bit |= ID_SUIT_BIT[cid]
+      for shift in (0, 16, 32, 48):
+        mask = suit_bit >> shift & 0xffff
+        if mask in flash_table: return flash_table[mask]
+    return rank_table[rank_key]
+
+  __SUITS = (Card.CLUB, Card.DIAMOND, Card.HEART, Card.SPADE)
+  __SUIT_COUNT = [1 << 4*Card.SUIT_INDEX_MAP[suit] if suit in Card.SUIT_INDEX_MAP else 0 for suit in range(17)]
+  __tables = None
+
+  @classmethod
+  def __load_tables(self):
+    HandEvaluator.__tables = load_tables()
+    return HandEvaluator.__tables
 
   @classmethod
   def __mask_hand_strength(self, bit):
@@ -0,0 +1,53 @@
+import numpy as np
+
+from pypokerengine.engine.hand_rank_table import RANK_KEY, ID_RANK, ID_SUIT, load_tables
+
+# Vectorized counterpart of HandEvaluator.eval_hand.
+# Cards are given by Card.to_id() (1-52, rank + 13 * suit index, ace = 1).
+# Each hand is reduced to its packed rank histogram and 4 suit masks with
+# array operations, then resolved through the same tables as eval_hand.
+
+_ID_RANK = np.array(ID_RANK, dtype=np.int64)
+_ID_SUIT = np.array(ID_SUIT, dtype=np.int64)
+_RANK_KEY = np.array(RANK_KEY, dtype=np.int64)
+_SUIT_SHIFT = np.array([0, 16, 32, 48], dtype=np.int64)
+
+_arrays = None
+
+def eval_hands_batch(holes, communities):
+  holes = np.asarray(holes, dtype=np.int64)
+  communities = np.asarray(communities, dtype=np.int64)
+  if communities.size == 0: communities = communities.reshape(len(holes), 0)
+  if holes.ndim != 2 or holes.shape[1] != 2:
+    raise ValueError("holes must be shaped (N, 2) but was %s" % (holes.shape,))
+  if communities.ndim != 2 or communities.shape[0] != holes.shape[0] or communities.shape[1] > 5:
+    raise ValueError("communities must be shaped (N, 0-5) but was %s" % (communities.shape,))
+
+  rank_keys, rank_flgs, flash_flgs = _fetch_arrays()
+  cards = np.concatenate([holes, communities], axis=1)
+  ranks, suits = _ID_RANK[cards], _ID_SUIT[cards]
+
+  rank_key = _RANK_KEY[ranks].sum(axis=1)
+  hand_flg = rank_flgs[np.searchsorted(rank_keys, rank_key)]
+  if cards.shape[1] >= 5:
+    # 16 bits per suit so the 4 suit masks pack into one int64 per hand
+    packed_masks = np.left_shift(1, ranks + 16 * suits).sum(axis=1)
+    suit_masks = packed_masks[:, None] >> _SUIT_SHIFT & 0xffff
+    flash_flg = flash_flgs[suit_masks].max(axis=1)
+    hand_flg = np.where(flash_flg != 0, flash_flg, hand_flg)
+
+  hole_ranks = np.sort(ranks[:, :2], axis=1)
+  hole_flg = hole_ranks[:, 1] << 4 | hole_ranks[:, 0]
+  hand_flg = np.where(hand_flg != 0, hand_flg, hole_flg)
+  return hand_flg << 8 | hole_flg
+
+def _fetch_arrays():
+  global _arrays
+  if _arrays is None:
+    rank_table, flash_table = load_tables()
+    rank_keys = np.array(sorted(rank_table.keys()), dtype=np.int64)
+    rank_flgs = np.array([rank_table[key] for key in rank_keys.tolist()], dtype=np.int64)
+    flash_flgs = np.zeros(1 << 15, dtype=np.int64)
+    for mask, flg in flash_table.items(): flash_flgs[mask] = flg
+    _arrays = rank_keys, rank_flgs, flash_flgs
+  return _arrays
@@ -0,0 +1,164 @@
+import os
+import struct
+import zlib
+from argparse import ArgumentParser
+
+# Lookup tables behind HandEvaluator.
+#
+# A hand is reduced to two integers while scanning its cards once:
+#   rank key  : sum of RANK_KEY[rank] (3 bits per rank, so it encodes the rank counts)
+#   suit mask : per suit, bit flg of the ranks held in that suit
+# If a suit mask holds 5 or more ranks the hand is a flash (or straight flash),
+# because flash cannot coexist with fourcard or fullhouse in 7 cards.
+# Otherwise the hand is decided by the rank counts alone.
+#
+# Both tables map to the hand part of HandEvaluator.eval_hand
+# ([Bit flg of hand][rank1(4bit)][rank2(4bit)]). RANK_TABLE holds 0 for
+# highcard hands, whose value depends on the hole card only.
+#
+# The tables are shipped in hand_rank_table.bin (regenerate it by running
+# this module) and built in memory when the file is missing or invalid.
+# File format (little endian):
+#   header : magic "HRNK", version (uint16), rank entry num (uint32), flash entry num (uint32)
+#   body   : zlib compressed rank keys (uint64), rank values (uint16),
+#            flash keys (uint16), flash values (uint16), keys in ascending order
+
+MAX_CARD_NUM = 7
+
+RANK_KEY = [0, 0] + [1 << 3*(rank-2) for rank in range(2, 15)]
+
+# Same values indexed by card id (see Card.to_id). Summing ID_SUIT_COUNT
+# packs the suit counts of a hand into 4 bits per suit, and OR-ing
+# ID_SUIT_BIT packs its suit masks into 16 bits per suit.
+ID_RANK = [0] + [14 if cid % 13 == 1 else (cid-1) % 13 + 1 for cid in range(1, 53)]
+ID_SUIT = [0] + [(cid-1) // 13 for cid in range(1, 53)]
+ID_RANK_KEY = [RANK_KEY[rank] for rank in ID_RANK]
+ID_SUIT_COUNT = [0] + [1 << 4*ID_SUIT[cid] for cid in range(1, 53)]
+ID_SUIT_BIT = [0] + [1 << (16*ID_SUIT[cid] + ID_RANK[cid]) for cid in range(1, 53)]
+
+_HIGHCARD      = 0
+_ONEPAIR       = 1 << 8
+_TWOPAIR       = 1 << 9
+_THREECARD     = 1 << 10
+_STRAIGHT      = 1 << 11
+_FLASH         = 1 << 12
+_FULLHOUSE     = 1 << 13
+_FOURCARD      = 1 << 14
+_STRAIGHTFLASH = 1 << 15
+
+HAND_RANK_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_rank_table.bin")
+
+RANK_ENTRY_NUM = 76155   # rank counts of 2 to 7 cards
+FLASH_ENTRY_NUM = 4719   # suit masks of 5 to 7 ranks
+
+_MAGIC = b"HRNK"
+_VERSION = 1
+_HEADER_FORMAT = "<4sHII"
+
+_tables = None
+
+def load_tables():
+  """Return (rank_table, flash_table), read from the shipped file on first use."""
+  global _tables
+  if _tables is None:
+    try:
+      _tables = read_tables(HAND_RANK_TABLE_PATH)
+    except (IOError, ValueError, struct.error, zlib.error):
+      _tables = build_tables()
+  return _tables
+
+def read_tables(path):
+  with open(path, "rb") as f:
+    data = f.read()
+  header_size = struct.calcsize(_HEADER_FORMAT)
+  magic, version, rank_num, flash_num = struct.unpack(_HEADER_FORMAT, data[:header_size])
+  if magic != _MAGIC or version != _VERSION or rank_num != RANK_ENTRY_NUM or flash_num != FLASH_ENTRY_NUM:
+    raise ValueError("%s is not a hand rank table (version %d)" % (path, _VERSION))
+  body = zlib.decompress(data[header_size:])
+  if len(body) != 10 * rank_num + 4 * flash_num:
+    raise ValueError("%s is truncated" % path)
+  rank_keys = struct.unpack_from("<%dQ" % rank_num, body, 0)
+  rank_values = struct.unpack_from("<%dH" % rank_num, body, 8 * rank_num)
+  flash_keys = struct.unpack_from("<%dH" % flash_num, body, 10 * rank_num)
+  flash_values = struct.unpack_from("<%dH" % flash_num, body, 10 * rank_num + 2 * flash_num)
+  return dict(zip(rank_keys, rank_values)), dict(zip(flash_keys, flash_values))
+
+def write_tables(path, tables):
+  rank_table, flash_table = tables
+  rank_keys, flash_keys = sorted(rank_table), sorted(flash_table)
+  body = struct.pack("<%dQ" % len(rank_keys), *rank_keys) + \
+      struct.pack("<%dH" % len(rank_keys), *[rank_table[key] for key in rank_keys]) + \
+      struct.pack("<%dH" % len(flash_keys), *flash_keys) + \
+      struct.pack("<%dH" % len(flash_keys), *[flash_table[key] for key in flash_keys])
+  header = struct.pack(_HEADER_FORMAT, _MAGIC, _VERSION, len(rank_keys), len(flash_keys))
+  with open(path, "wb") as f:
+    f.write(header + zlib.compress(body, 9))
+
+def build_tables():
+  rank_table = {}
+  for counts in _gen_rank_counts(2, MAX_CARD_NUM):
+    key = sum([RANK_KEY[rank] * count for rank, count in counts.items()])
+    rank_table[key] = _eval_rank_counts(counts)
+  flash_table = {}
+  for mask in range(1 << 15):
+    if mask & 3 == 0 and 5 <= bin(mask).count("1") <= MAX_CARD_NUM:
+      flash_table[mask] = _eval_flash_mask(mask)
+  return rank_table, flash_table
+
+def _gen_rank_counts(rank, rest):
+  if rank == 15:
+    yield {}
+    return
+  for count in range(min(4, rest)+1):
+    for counts in _gen_rank_counts(rank+1, rest-count):
+      if count != 0: counts[rank] = count
+      yield counts
+
+def _eval_rank_counts(counts):
+  fourcard = [rank for rank, count in counts.items() if count >= 4]
+  if fourcard:
+    return _FOURCARD | min(fourcard) << 4
+  three_card_ranks = [rank for rank, count in counts.items() if count >= 3]
+  two_pair_ranks = [rank for rank, count in counts.items() if count == 2]
+  if len(three_card_ranks) == 2:
+    two_pair_ranks.append(min(three_card_ranks))
+  if three_card_ranks and two_pair_ranks:
+    return _FULLHOUSE | max(three_card_ranks) << 4 | max(two_pair_ranks)
+  straight = _search_straight(_rank_mask(counts.keys()))
+  if straight != -1:
+    return _STRAIGHT | straight << 4
+  if three_card_ranks:
+    return _THREECARD | max(three_card_ranks) << 4
+  if len(two_pair_ranks) >= 2:
+    high, low = sorted(two_pair_ranks)[::-1][:2]
+    return _TWOPAIR | high << 4 | low
+  if two_pair_ranks:
+    return _ONEPAIR | two_pair_ranks[0] << 4
+  return _HIGHCARD
+
+def _eval_flash_mask(mask):
+  straight = _search_straight(mask)
+  if straight != -1:
+    return _STRAIGHTFLASH | straight << 4
+  return _FLASH | (mask.bit_length()-1) << 4
+
+def _rank_mask(ranks):
+  mask = 0
+  for rank in ranks: mask |= 1 << rank
+  return mask
+
+# Straight is identified by its lowest rank and ace is never used as 1,
+# same as the original predicate cascade of HandEvaluator.
+def _search_straight(mask):
+  rank = -1
+  for r in range(2, 11):
+    if (mask >> r) & 31 == 31: rank = r
+  return rank
+
+def parse_arguments():
+  parser = ArgumentParser(description="Generate the hand rank table")
+  parser.add_argument('-o', '--output', help="Output path", default=HAND_RANK_TABLE_PATH, type=str)
+  return parser.parse_args().output
+
+if __name__ == '__main__':
+  write_tables(parse_arguments(), build_tables())
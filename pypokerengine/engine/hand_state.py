@@ -0,0 +1,77 @@
+from pypokerengine.engine.hand_rank_table import MAX_CARD_NUM, ID_RANK, ID_RANK_KEY, ID_SUIT_BIT, ID_SUIT_COUNT, load_tables
+
+# Hand of one player built up street by street.
+# Keeps the packed rank counts, suit counts and suit masks of the cards seen
+# so far (see hand_rank_table), so adding a card and reading the score are
+# both O(1). score() returns the same value as HandEvaluator.eval_hand.
+
+class HandState(object):
+
+  __slots__ = ("hole_flg", "rank_key", "suit_count", "suit_bit", "card_ids")
+
+  def __init__(self, hole, community=None):
+    self.__setup([card.to_id() for card in hole], [card.to_id() for card in community or []])
+
+  @classmethod
+  def from_ids(self, hole_ids, community_ids=None):
+    state = self.__new__(self)
+    state.__setup(hole_ids, community_ids or [])
+    return state
+
+  def add_card(self, card):
+    return self.add_card_id(card.to_id())
+
+  def add_card_id(self, card_id):
+    if len(self.card_ids) == MAX_CARD_NUM:
+      raise ValueError("Hand already holds %d cards" % MAX_CARD_NUM)
+    self.card_ids.append(card_id)
+    self.rank_key += ID_RANK_KEY[card_id]
+    self.suit_count += ID_SUIT_COUNT[card_id]
+    self.suit_bit |= ID_SUIT_BIT[card_id]
+    return self.score()
+
+  def score(self):
+    return self.__score(self.rank_key, self.suit_count, self.suit_bit)
+
+  # Score after adding the card, leaving this state untouched
+  def score_with(self, card):
+    return self.score_with_id(card.to_id())
+
+  def score_with_id(self, card_id):
+    if len(self.card_ids) == MAX_CARD_NUM:
+      raise ValueError("Hand already holds %d cards" % MAX_CARD_NUM)
+    return self.__score(self.rank_key + ID_RANK_KEY[card_id],
+        self.suit_count + ID_SUIT_COUNT[card_id], self.suit_bit | ID_SUIT_BIT[card_id])
+
+  # {card id: score} for every card not held yet. Used to walk chance nodes.
+  def next_card_scores(self, excluded_ids=None):
+    used = set(self.card_ids)
+    if excluded_ids: used.update(excluded_ids)
+    return dict((cid, self.score_with_id(cid)) for cid in range(1, 53) if cid not in used)
+
+  def copy(self):
+    state = HandState.__new__(HandState)
+    state.hole_flg = self.hole_flg
+    state.rank_key = self.rank_key
+    state.suit_count = self.suit_count
+    state.suit_bit = self.suit_bit
+    state.card_ids = self.card_ids[:]
+    return state
+
+  def __setup(self, hole_ids, community_ids):
+    high, low = ID_RANK[hole_ids[0]], ID_RANK[hole_ids[1]]
+    if high < low: high, low = low, high
+    self.hole_flg = high << 4 | low
+    self.rank_key = self.suit_count = self.suit_bit = 0
+    self.card_ids = []
+    for card_id in list(hole_ids) + list(community_ids): self.add_card_id(card_id)
+
+  def __score(self, rank_key, suit_count, suit_bit):
+    rank_table, flash_table = load_tables()
+    hand_flg = 0
+    if (suit_count + 0x3333) & 0x8888:  # some suit holds 5 or more cards
+      for shift in (0, 16, 32, 48):
+        hand_flg = flash_table.get(suit_bit >> shift & 0xffff, 0)
+        if hand_flg: break
+    hand_flg = hand_flg or rank_table[rank_key] or self.hole_flg
+    return hand_flg << 8 | self.hole_flg
@@ -1,6 +1,41 @@
+from collections.abc import Mapping
+
 from pypokerengine.engine.data_encoder import DataEncoder
 from pypokerengine.engine.action_checker import ActionChecker
 
+class LazyMessage(Mapping):
+  """Message content whose expensive fields are encoded on first read.
+
+  Lazy fields are given as functions of a snapshot of the game state taken
+  when the message is built, so later updates of the state (RoundManager
+  may update it in place) never leak into the message. Messages built from
+  the same table state can share one table snapshot (see snapshot_table).
+  """
+
+  def __init__(self, fields, lazy_fields, snapshot):
+    self.__keys = list(fields.keys()) + [key for key in lazy_fields if key not in fields]
+    self.__fields = dict(fields)
+    self.__lazy_fields = dict(lazy_fields)
+    self.__snapshot = snapshot
+
+  def __getitem__(self, key):
+    if key in self.__lazy_fields:
+      self.__fields[key] = self.__lazy_fields.pop(key)(self.__snapshot)
+      if not self.__lazy_fields: self.__snapshot = None
+    return self.__fields[key]
+
+  def __iter__(self):
+    return iter(self.__keys)
+
+  def __len__(self):
+    return len(self.__keys)
+
+  def materialize(self):
+    return dict((key, self[key]) for key in self.__keys)
+
+  def __repr__(self):
+    return repr(self.materialize())
+
 class MessageBuilder:
 
   GAME_START_MESSAGE = "game_start_message"
@@ -32,16 +67,14 @@ class MessageBuilder:
     return self.__build_notification_message(message)
 
   @classmethod
-  def build_street_start_message(self, state):
-    message = {
-        "message_type": self.STREET_START_MESSAGE,
-        "round_state": DataEncoder.encode_round_state(state)
-        }
+  def build_street_start_message(self, state, table_snapshot=None):
+    message = { "message_type": self.STREET_START_MESSAGE }
     message.update(DataEncoder.encode_street(state["street"]))
-    return self.__build_notification_message(message)
+    lazy_fields = { "round_state": DataEncoder.encode_round_state }
+    return self.__build_notification_message(LazyMessage(message, lazy_fields, self.__snapshot(state, table_snapshot)))
 
   @classmethod
-  def build_ask_message(self, player_pos, state):
+  def build_ask_message(self, player_pos, state, table_snapshot=None):
     players = state["table"].seats.players
     player = players[player_pos]
     hole_card = DataEncoder.encode_player(player, holecard=True)["hole_card"]
@@ -49,33 +82,29 @@ class MessageBuilder:
     message = {
         "message_type" : self.ASK_MESSAGE,
         "hole_card": hole_card,
-        "valid_actions": valid_actions,
-        "round_state": DataEncoder.encode_round_state(state),
-        "action_histories": DataEncoder.encode_action_histories(state["table"])
+        "valid_actions": valid_actions
     }
-    return self.__build_ask_message(message)
+    return self.__build_ask_message(LazyMessage(message, self.__round_state_fields, self.__snapshot(state, table_snapshot)))
 
   @classmethod
-  def build_game_update_message(self, player_pos, action, amount, state):
+  def build_game_update_message(self, player_pos, action, amount, state, table_snapshot=None):
     player = state["table"].seats.players[player_pos]
     message = {
         "message_type": self.GAME_UPDATE_MESSAGE,
-        "action": DataEncoder.encode_action(player, action, amount),
-        "round_state": DataEncoder.encode_round_state(state),
-        "action_histories": DataEncoder.encode_action_histories(state["table"])
+        "action": DataEncoder.encode_action(player, action, amount)
     }
-    return self.__build_notification_message(message)
+    return self.__build_notification_message(LazyMessage(message, self.__round_state_fields, self.__snapshot(state, table_snapshot)))
 
   @classmethod
   def build_round_result_message(self, round_count, winners, hand_info, state):
     message = {
         "message_type": self.ROUND_RESULT_MESSAGE,
         "round_count": round_count,
-        "hand_info"  : hand_info,
-        "round_state": DataEncoder.encode_round_state(state)
+        "hand_info"  : hand_info
     }
     message.update(DataEncoder.encode_winners(winners))
-    return self.__build_notification_message(message)
+    lazy_fields = { "round_state": DataEncoder.encode_round_state }
+    return self.__build_notification_message(LazyMessage(message, lazy_fields, self.__snapshot(state, None)))
 
   @classmethod
   def build_game_result_message(self, config, seats):
@@ -86,6 +115,23 @@ class MessageBuilder:
     return self.__build_notification_message(message)
 
 
+  __round_state_fields = {
+      "round_state": lambda state: DataEncoder.encode_round_state(state),
+      "action_histories": lambda state: DataEncoder.encode_action_histories(state["table"])
+  }
+
+  # Copy of the table to pass as table_snapshot to every message built
+  # before the table changes again. Messages only read it.
+  @classmethod
+  def snapshot_table(self, state):
+    return state["table"].clone()
+
+  @classmethod
+  def __snapshot(self, state, table_snapshot):
+    snapshot = dict(state)
+    snapshot["table"] = table_snapshot if table_snapshot is not None else self.snapshot_table(state)
+    return snapshot
+
   @classmethod
   def __build_ask_message(self, message):
     return {
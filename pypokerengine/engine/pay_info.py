@@ -17,6 +17,9 @@ class PayInfo:
   def update_to_allin(self):
     self.status = self.ALLIN
 
+  def clone(self):
+    return PayInfo(amount=self.amount, status=self.status)
+
   # serialize format : [amount, status]
   def serialize(self):
     return [self.amount, self.status]
@@ -15,24 +15,60 @@ class Player:
   def __init__(self, uuid, initial_stack, name="No Name"):
     self.name = name
     self.uuid = uuid
-    self.hole_card = []
+    self.hole_card_ids = []
     self.stack = initial_stack
     self.round_action_histories = self.__init_round_action_histories()
     self.action_histories = []
     self.pay_info = PayInfo()
     self.too_poor = False # If the player is too poor to participate (ie cannot bet the blind amount, then it should be forced to FOLD)
 
+  # Hole card is held as card ids. Card objects are built on access.
+  @property
+  def hole_card(self):
+    return [Card.from_id(cid) for cid in self.hole_card_ids]
+
+  @hole_card.setter
+  def hole_card(self, cards):
+    self.hole_card_ids = [card.to_id() for card in cards]
+
+  # Running aggregates of the histories (street_paid, street_raise_num,
+  # street_last_raise and saved_raise_num) are updated by add_action_history,
+  # save_street_action_histories and clear_action_histories, and recalculated
+  # when a new list is assigned. Do not edit the history lists in place.
+  @property
+  def action_histories(self):
+    return self.__action_histories
+
+  @action_histories.setter
+  def action_histories(self, histories):
+    self.__action_histories = histories
+    self.street_paid, self.street_raise_num, self.street_last_raise = 0, 0, None
+    for history in histories: self.__count_history(history)
+
+  @property
+  def round_action_histories(self):
+    return self.__round_action_histories
+
+  @round_action_histories.setter
+  def round_action_histories(self, histories):
+    self.__round_action_histories = histories
+    self.saved_raise_num = 0
+    for street_histories in histories:
+      if street_histories is None: break
+      self.saved_raise_num += len([h for h in street_histories if h["action"] == self.ACTION_RAISE_STR])
+
   def add_holecard(self, cards):
-    if len(self.hole_card) != 0:
-      raise ValueError(self.__dup_hole_msg)
-    if len(cards) != 2:
-      raise ValueError(self.__wrong_num_hole_msg % (len(cards)))
     if not all([isinstance(card, Card) for card in cards]):
+      self.__validate_holecard_num(cards)
       raise ValueError(self.__wrong_type_hole_msg)
-    self.hole_card = cards
+    self.add_holecard_ids([card.to_id() for card in cards])
+
+  def add_holecard_ids(self, card_ids):
+    self.__validate_holecard_num(card_ids)
+    self.hole_card_ids = card_ids
 
   def clear_holecard(self):
-    self.hole_card = []
+    self.hole_card_ids = []
 
   def append_chip(self, amount):
     self.stack += amount
@@ -65,10 +101,17 @@ class Player:
     else:
       raise "UnKnown action history is added (kind = %s)" % kind
     history = self.__add_uuid_on_history(history)
-    self.action_histories.append(history)
+    self.__action_histories.append(history)
+    self.__count_history(history)
 
   def save_street_action_histories(self, street_flg):
-    self.round_action_histories[street_flg] = self.action_histories
+    histories = self.__round_action_histories
+    next_street = all([h is not None for h in histories[:street_flg]]) and all([h is None for h in histories[street_flg:]])
+    histories[street_flg] = self.__action_histories
+    if next_street:
+      self.saved_raise_num += self.street_raise_num
+    else:
+      self.round_action_histories = histories  # recalculate
     self.action_histories = []
 
   def clear_action_histories(self):
@@ -79,12 +122,38 @@ class Player:
     self.pay_info = PayInfo()
 
   def paid_sum(self):
-    pay_history = [h for h in self.action_histories if h["action"] not in ["FOLD", "ANTE"]]
-    last_pay_history = pay_history[-1] if len(pay_history)!=0 else None
-    return last_pay_history["amount"] if last_pay_history else 0
+    return self.street_paid
+
+  # RAISE, SMALLBLIND or BIGBLIND history of this street with the largest amount
+  def last_raise(self):
+    return self.street_last_raise
+
+  # Number of RAISE in this round (saved streets up to the first unsaved one, plus this street)
+  def round_raise_num(self):
+    return self.saved_raise_num + self.street_raise_num
+
+  # Same result as deserialize(serialize()) without building the serial lists.
+  # Recorded action histories are never mutated, so the history dicts are shared.
+  # too_poor is decided again by the dealer every round and starts cleared,
+  # as it does after deserialize.
+  def clone(self):
+    player = Player.__new__(Player)
+    player.name = self.name
+    player.uuid = self.uuid
+    player.hole_card_ids = self.hole_card_ids[::]
+    player.stack = self.stack
+    player.__round_action_histories = self.__round_action_histories[::]
+    player.__action_histories = self.__action_histories[::]
+    player.street_paid = self.street_paid
+    player.street_raise_num = self.street_raise_num
+    player.street_last_raise = self.street_last_raise
+    player.saved_raise_num = self.saved_raise_num
+    player.pay_info = self.pay_info.clone()
+    player.too_poor = False
+    return player
 
   def serialize(self):
-    hole = [card.to_id() for card in self.hole_card]
+    hole = self.hole_card_ids[::]
     return [
         self.name, self.uuid, self.stack, hole,\
             self.action_histories[::], self.pay_info.serialize(), self.round_action_histories[::]
@@ -92,9 +161,8 @@ class Player:
 
   @classmethod
   def deserialize(self, serial):
-    hole = [Card.from_id(cid) for cid in serial[3]]
     player = self(serial[1], serial[2], serial[0])
-    if len(hole)!=0: player.add_holecard(hole)
+    if len(serial[3])!=0: player.add_holecard_ids(serial[3][::])
     player.action_histories = serial[4]
     player.pay_info = PayInfo.deserialize(serial[5])
     player.round_action_histories = serial[6]
@@ -107,6 +175,24 @@ class Player:
   __wrong_type_hole_msg = "You passed not Card object as hole card"
   __collect_err_msg = "Failed to collect %d chips. Because he has only %d chips"
 
+  def __validate_holecard_num(self, cards):
+    if len(self.hole_card_ids) != 0:
+      raise ValueError(self.__dup_hole_msg)
+    if len(cards) != 2:
+      raise ValueError(self.__wrong_num_hole_msg % (len(cards)))
+
+  def __count_history(self, history):
+    action = history["action"]
+    if action != self.ACTION_FOLD_STR and action != self.ACTION_ANTE:
+      self.street_paid = history["amount"]
+    if action == self.ACTION_RAISE_STR:
+      self.street_raise_num += 1
+    if action in self.__RAISE_ACTIONS and \
+        (self.street_last_raise is None or history["amount"] > self.street_last_raise["amount"]):
+      self.street_last_raise = history
+
+  __RAISE_ACTIONS = (ACTION_RAISE_STR, ACTION_SMALL_BLIND, ACTION_BIG_BLIND)
+
   def __init_round_action_histories(self):
     return [None for _ in range(4)]  # 4 == len(["preflop", "flop", "turn", "river"])
 
@@ -1,6 +1,5 @@
 from functools import reduce
 
-from pypokerengine.engine.table import Table
 from pypokerengine.engine.player import Player
 from pypokerengine.engine.pay_info import PayInfo
 from pypokerengine.engine.poker_constants import PokerConstants as Const
@@ -10,10 +9,15 @@ from pypokerengine.engine.message_builder import MessageBuilder
 
 class RoundManager:
 
+  # With inplace=True the passed table (or state) is updated and returned
+  # instead of a copy. Use it only when the caller drops the old state.
+  # Copies and message snapshots are Table.clone calls. Most of the cost
+  # left is the round logic on Player objects; for search and rollouts use
+  # CompactRoundManager, which works on flat states and builds no messages.
   @classmethod
-  def start_new_round(self, round_count, small_blind_amount, ante_amount, table):
+  def start_new_round(self, round_count, small_blind_amount, ante_amount, table, inplace=False):
     _state = self.__gen_initial_state(round_count, small_blind_amount, table)
-    state = self.__deep_copy_state(_state)
+    state = _state if inplace else self.__deep_copy_state(_state)
     table = state["table"]
 
     table.deck.shuffle()
@@ -25,10 +29,11 @@ class RoundManager:
     return state, start_msg + street_msgs
 
   @classmethod
-  def apply_action(self, original_state, action):
-    state = self.__deep_copy_state(original_state)
+  def apply_action(self, original_state, action, inplace=False):
+    state = original_state if inplace else self.__deep_copy_state(original_state)
     state,bet_amount = self.__update_state_by_action(state, action)
-    update_msg = self.__update_message(state, action, bet_amount)
+    table_snapshot = MessageBuilder.snapshot_table(state)
+    update_msg = self.__update_message(state, action, bet_amount, table_snapshot)
     if self.__is_everyone_agreed(state):
       [player.save_street_action_histories(state["street"]) for player in state["table"].seats.players]
       state["street"] += 1
@@ -38,7 +43,7 @@ class RoundManager:
       state["next_player"] = state["table"].next_ask_waiting_player_pos(state["next_player"])
       next_player_pos = state["next_player"]
       next_player = state["table"].seats.players[next_player_pos]
-      ask_message = (next_player.uuid, MessageBuilder.build_ask_message(next_player_pos, state))
+      ask_message = (next_player.uuid, MessageBuilder.build_ask_message(next_player_pos, state, table_snapshot))
       return state, [update_msg, ask_message]
 
 
@@ -69,7 +74,7 @@ class RoundManager:
   @classmethod
   def __deal_holecard(self, deck, players):
     for player in players:
-      player.add_holecard(deck.draw_cards(2))
+      player.add_holecard_ids(deck.draw_card_ids(2))
 
   @classmethod
   def __start_street(self, state):
@@ -97,18 +102,18 @@ class RoundManager:
 
   @classmethod
   def __flop(self, state):
-    for card in state["table"].deck.draw_cards(3):
-      state["table"].add_community_card(card)
+    for card_id in state["table"].deck.draw_card_ids(3):
+      state["table"].add_community_card_id(card_id)
     return self.__forward_street(state)
 
   @classmethod
   def __turn(self, state):
-    state["table"].add_community_card(state["table"].deck.draw_card())
+    state["table"].add_community_card_id(state["table"].deck.draw_card_id())
     return self.__forward_street(state)
 
   @classmethod
   def __river(self, state):
-    state["table"].add_community_card(state["table"].deck.draw_card())
+    state["table"].add_community_card_id(state["table"].deck.draw_card_id())
     return self.__forward_street(state)
 
   @classmethod
@@ -134,16 +139,20 @@ class RoundManager:
   @classmethod
   def __forward_street(self, state):
     table = state["table"]
-    street_start_msg = [(-1, MessageBuilder.build_street_start_message(state))]
-    if table.seats.count_active_players() == 1: street_start_msg = []
-    if table.seats.count_ask_wait_players() <= 1:
+    need_street_start_msg = table.seats.count_active_players() != 1
+    need_ask = table.seats.count_ask_wait_players() > 1
+    table_snapshot = MessageBuilder.snapshot_table(state) if need_street_start_msg or need_ask else None
+    street_start_msg = []
+    if need_street_start_msg:
+      street_start_msg = [(-1, MessageBuilder.build_street_start_message(state, table_snapshot))]
+    if not need_ask:
       state["street"] += 1
       state, messages = self.__start_street(state)
       return state, street_start_msg + messages
     else:
       next_player_pos = state["next_player"]
       next_player = table.seats.players[next_player_pos]
-      ask_message = [(next_player.uuid, MessageBuilder.build_ask_message(next_player_pos, state))]
+      ask_message = [(next_player.uuid, MessageBuilder.build_ask_message(next_player_pos, state, table_snapshot))]
       return state, street_start_msg + ask_message
 
   @classmethod
@@ -190,9 +199,9 @@ class RoundManager:
     player.pay_info.update_by_pay(need_amount)
 
   @classmethod
-  def __update_message(self, state, action, bet_amount):
+  def __update_message(self, state, action, bet_amount, table_snapshot):
     return (-1, MessageBuilder.build_game_update_message(
-      state["next_player"], action, bet_amount, state))
+      state["next_player"], action, bet_amount, state, table_snapshot))
 
   @classmethod
   def __is_everyone_agreed(self, state):
@@ -234,7 +243,7 @@ class RoundManager:
 
   @classmethod
   def __deep_copy_state(self, state):
-    table_deepcopy = Table.deserialize(state["table"].serialize())
+    table_deepcopy = state["table"].clone()
     return {
         "round_count": state["round_count"],
         "small_blind_amount": state["small_blind_amount"],
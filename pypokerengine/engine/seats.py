@@ -18,6 +18,11 @@ class Seats:
   def count_ask_wait_players(self):
     return len([p for p in self.players if p.is_waiting_ask()])
 
+  def clone(self):
+    seats = Seats()
+    seats.players = [player.clone() for player in self.players]
+    return seats
+
   def serialize(self):
     return [player.serialize() for player in self.players]
 
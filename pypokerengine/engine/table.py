@@ -1,15 +1,17 @@
+import random
+
 from pypokerengine.engine.card import Card
 from pypokerengine.engine.seats import Seats
 from pypokerengine.engine.deck import Deck
 
 class Table:
 
-  def __init__(self, cheat_deck=None):
+  def __init__(self, cheat_deck=None, rng=random):
     self.dealer_btn = 0
     self._blind_pos = None
     self.seats = Seats()
-    self.deck = cheat_deck if cheat_deck else Deck()
-    self._community_card = []
+    self.deck = cheat_deck if cheat_deck else Deck(rng=rng)
+    self._community_card = []  # card ids (see Card.to_id)
 
   def set_blind_pos(self, sb_pos, bb_pos):
     self._blind_pos = [sb_pos, bb_pos]
@@ -23,12 +25,18 @@ class Table:
     return self._blind_pos[1]
 
   def get_community_card(self):
+    return [Card.from_id(cid) for cid in self._community_card]
+
+  def get_community_card_ids(self):
     return self._community_card[::]
 
   def add_community_card(self, card):
+    self.add_community_card_id(card.to_id())
+
+  def add_community_card_id(self, card_id):
     if len(self._community_card) == 5:
       raise ValueError(self.__exceed_card_size_msg)
-    self._community_card.append(card)
+    self._community_card.append(card_id)
 
   def reset(self):
     self.deck.restore()
@@ -37,6 +45,7 @@ class Table:
       player.clear_holecard()
       player.clear_action_histories()
       player.clear_pay_info()
+      player.too_poor = False
 
   def shift_dealer_btn(self):
     self.dealer_btn = self.next_active_player_pos(self.dealer_btn)
@@ -47,17 +56,28 @@ class Table:
   def next_ask_waiting_player_pos(self, start_pos):
     return self.__find_entitled_player_pos(start_pos, lambda player: player.is_waiting_ask())
 
+  # Copy of the table which shares nothing mutable with the original
+  # (equivalent to deserialize(serialize()) but much cheaper)
+  def clone(self):
+    table = Table.__new__(Table)
+    table.dealer_btn = self.dealer_btn
+    table._blind_pos = self._blind_pos
+    table.seats = self.seats.clone()
+    table.deck = self.deck.clone()
+    table._community_card = self._community_card[::]
+    return table
+
   def serialize(self):
-    community_card = [card.to_id() for card in self._community_card]
+    community_card = self._community_card[::]
     return [
         self.dealer_btn, Seats.serialize(self.seats),
         Deck.serialize(self.deck), community_card, self._blind_pos
     ]
 
   @classmethod
-  def deserialize(self, serial):
-    deck = Deck.deserialize(serial[2])
-    community_card = [Card.from_id(cid) for cid in serial[3]]
+  def deserialize(self, serial, rng=random):
+    deck = Deck.deserialize(serial[2], rng=rng)
+    community_card = serial[3][::]
     table = self(cheat_deck=deck)
     table.dealer_btn = serial[0]
     table.seats = Seats.deserialize(serial[1])
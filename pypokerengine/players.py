@@ -14,6 +14,14 @@ class BasePokerPlayer(object):
   - receive_round_result_message
   """
 
+  # Notification types (e.g. "game_update_message") this player does not
+  # handle. They are dropped before their payload is built.
+  ignored_notifications = ()
+
+  # Deadline of the current declare_action (see utils.deadline), set by the
+  # engine before each call. Poll deadline.remaining() to answer in time.
+  deadline = None
+
   def __init__(self):
     pass
 
@@ -60,6 +68,7 @@ class BasePokerPlayer(object):
   def receive_notification(self, message):
     """Called from Dealer when notification received from RoundManager"""
     msg_type = message["message_type"]
+    if msg_type in self.ignored_notifications: return
 
     if msg_type == "game_start_message":
       info = self.__parse_game_start_message(message)
@@ -117,3 +126,22 @@ class BasePokerPlayer(object):
     round_state = message["round_state"]
     return winners, hand_info, round_state
 
+
+class BaseHeadlessPlayer(object):
+  """Lean poker client for headless games (start_poker(config, headless=True))
+
+  Only declare_action is called, with
+  - state : CompactGameState of the round. The asking player sits at
+            state.next_player. It is shared with the engine, so read it
+            (or copy it) but never modify it.
+  - legal_actions : tuple of action names, e.g. ("fold", "call", "raise")
+  and must return one of the legal action names. Anything else is a fold.
+  No notification is sent.
+  """
+
+  def declare_action(self, state, legal_actions):
+    err_msg = "Your client does not implement [ {0} ] method".format("declare_action")
+    raise NotImplementedError(err_msg)
+
+  def set_uuid(self, uuid):
+    self.uuid = uuid
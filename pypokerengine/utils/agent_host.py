@@ -0,0 +1,145 @@
+"""
+Persistent process sandbox for players.
+
+AgentHost keeps one player (built by factory() in a child process) loaded
+for the whole game and talks to it over a multiprocessing Pipe:
+
+    parent -> child : ("uuid", uuid) / ("notify", message) / ("ask", message) / ("close", None)
+    child -> parent : ("ready", ignored_notifications) once, then
+                      ("action", action) or ("error", exception) per ask
+
+Messages are sent as plain dicts (lazy fields are encoded first). The parent
+waits for an answer with Connection.poll, so there is no process start and
+no sleep loop per decision. A child that misses its deadline is killed and
+the default action is returned. A fresh child is started for the next
+message; the killed player's memory is lost. A child that dies is handled
+the same way.
+
+HostedPlayer wraps an AgentHost as a BasePokerPlayer, so it can be
+registered like any other player:
+
+    config.register_player("bot", HostedPlayer(SmartPlayer))
+"""
+
+import multiprocessing
+
+from pypokerengine.engine.message_builder import LazyMessage
+from pypokerengine.players import BasePokerPlayer
+from pypokerengine.utils.deadline import Deadline
+
+class AgentHost(object):
+
+    def __init__(self, factory, seconds=0.5, default="fold"):
+        self.factory = factory
+        self.seconds = seconds
+        self.default = default
+        self.ignored_notifications = ()
+        self.asks = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.__uuid = None
+        self.__process = None
+        self.__conn = None
+
+    def set_uuid(self, uuid):
+        self.__uuid = uuid
+        self.__send("uuid", uuid)
+
+    def notify(self, message):
+        if message["message_type"] in self.ignored_notifications: return
+        try:
+            self.__send("notify", _to_plain(message))
+        except (EOFError, OSError):
+            self.__kill()
+
+    def ask(self, message):
+        deadline = Deadline(self.seconds)
+        self.asks += 1
+        try:
+            self.__send("ask", _to_plain(message))
+            if not self.__conn.poll(deadline.remaining()):
+                self.timeouts += 1
+                self.__kill()
+                return self.default
+            kind, load = self.__conn.recv()
+        except (EOFError, OSError):  # the child died
+            self.__kill()
+            return self.default
+        if kind == "error": raise load
+        return load
+
+    def close(self):
+        if self.__process is None: return
+        try:
+            self.__conn.send(("close", None))
+        except (EOFError, OSError):
+            pass
+        self.__process.join(self.seconds)
+        if self.__process.is_alive(): self.__kill()
+        self.__process = self.__conn = None
+
+    def __send(self, kind, load):
+        if self.__process is None: self.__start()
+        self.__conn.send((kind, load))
+
+    def __start(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self.__process = multiprocessing.Process(target=_serve, args=(child_conn, self.factory, self.seconds))
+        self.__process.daemon = True
+        self.__process.start()
+        child_conn.close()
+        self.__conn = parent_conn
+        kind, self.ignored_notifications = self.__conn.recv()
+        if self.__uuid is not None: self.__conn.send(("uuid", self.__uuid))
+
+    def __kill(self):
+        self.__process.kill()
+        self.__process.join()
+        self.__conn.close()
+        self.__process = self.__conn = None
+        self.restarts += 1
+
+class HostedPlayer(BasePokerPlayer):
+
+    def __init__(self, factory, seconds=0.5, default="fold"):
+        self.host = AgentHost(factory, seconds, default)
+
+    def set_uuid(self, uuid):
+        self.uuid = uuid
+        self.host.set_uuid(uuid)
+
+    def respond_to_ask(self, message):
+        return self.host.ask(message)
+
+    def receive_notification(self, message):
+        self.host.notify(message)
+
+    def close(self):
+        self.host.close()
+
+def _to_plain(message):
+    return message.materialize() if isinstance(message, LazyMessage) else message
+
+# Child process loop. Errors while handling a notification are reported on the next ask.
+def _serve(conn, factory, seconds):
+    player = factory()
+    conn.send(("ready", tuple(getattr(player, "ignored_notifications", ()))))
+    error = None
+    while True:
+        kind, load = conn.recv()
+        if kind == "close": return
+        try:
+            if kind == "uuid":
+                player.set_uuid(load)
+            elif kind == "notify":
+                player.receive_notification(load)
+            elif kind == "ask":
+                player.deadline = Deadline(seconds)
+                if error is not None: raise error
+                conn.send(("action", player.respond_to_ask(load)))
+        except Exception as e:
+            if kind != "ask":
+                error = error or e
+                continue
+            conn.send(("error", e))
+            error = None
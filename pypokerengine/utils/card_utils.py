@@ -1,16 +1,201 @@
+import math
 import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed by estimate_hole_card_equity_until
+    np = None
 
 from pypokerengine.engine.card import Card
 from pypokerengine.engine.deck import Deck
 from pypokerengine.engine.hand_evaluator import HandEvaluator
+from pypokerengine.utils.preflop_equity_table import MAX_PLAYER_NUM, hole_card_class_index, load_preflop_equity_table
 
 def gen_cards(cards_str):
     return [Card.from_str(s) for s in cards_str]
 
-def estimate_hole_card_win_rate(nb_simulation, nb_player, hole_card, community_card=None):
+# Above this number of (board, opponents hole) combinations equity is always
+# sampled. Below it, enumeration is used only when it is cheaper than sampling.
+EXACT_ENUMERATION_THRESHOLD = 50000
+
+def estimate_hole_card_win_rate(nb_simulation, nb_player, hole_card, community_card=None,
+        exact_threshold=EXACT_ENUMERATION_THRESHOLD, rng=random):
+    win_count, tie_count, _, total = _equity_counts(
+            nb_simulation, nb_player, hole_card, community_card, exact_threshold, rng)
+    return 1.0 * (win_count + tie_count) / total
+
+def estimate_hole_card_equity(nb_simulation, nb_player, hole_card, community_card=None,
+        exact_threshold=EXACT_ENUMERATION_THRESHOLD, rng=random):
+    """Return win/tie/lose fractions of hole_card against nb_player-1 random hands.
+
+    Every combination of remaining board cards and opponents hole cards is
+    enumerated when there are at most exact_threshold of them (see
+    count_equity_combinations) and at most nb_simulation * nb_player, the
+    number of hands evaluated by sampling. Otherwise nb_simulation random
+    deals are drawn from rng (the random module or e.g. random.Random(seed)).
+    """
+    win_count, tie_count, lose_count, total = _equity_counts(
+            nb_simulation, nb_player, hole_card, community_card, exact_threshold, rng)
+    return {
+            "win": 1.0 * win_count / total,
+            "tie": 1.0 * tie_count / total,
+            "lose": 1.0 * lose_count / total
+            }
+
+def estimate_hole_card_equity_until(nb_player, hole_card, community_card=None, epsilon=0.01,
+        time_budget=None, max_simulation=100000, batch_size=1000, seed=None):
+    """Monte Carlo equity with NumPy, sampled batch by batch until precise enough.
+
+    Stops when the half width of the 95% (Wilson) confidence interval of the
+    win rate (win + tie) is at most epsilon, when time_budget seconds have passed or
+    when max_simulation deals are sampled, whichever comes first. At least one
+    batch is always sampled. Returns the same fractions as
+    estimate_hole_card_equity plus "nb_simulation", the number of deals used.
+    """
+    if np is None: raise ImportError("estimate_hole_card_equity_until requires numpy")
+    if batch_size < 1:
+        raise ValueError("Need at least one simulation per batch [batch_size = %s]" % batch_size)
+    if max_simulation < 1:
+        raise ValueError("Need at least one simulation [max_simulation = %s]" % max_simulation)
+    if not community_card: community_card = []
+    start = time.monotonic()
+    rng = np.random.RandomState(seed)
+    hole_ids, community_ids = _to_ids(hole_card), _to_ids(community_card)
+    used = set(hole_ids + community_ids)
+    unused_ids = np.array([cid for cid in _ALL_CARD_IDS if cid not in used])
+    need_num = 5 - len(community_ids)
+    draw_num = need_num + (nb_player-1)*2
+    counts = np.zeros(3, dtype=np.int64)
+    while True:
+        size = min(batch_size, max_simulation - counts.sum())
+        drawn = unused_ids[np.argsort(rng.random_sample((size, len(unused_ids))), axis=1)[:, :draw_num]]
+        boards = np.concatenate([np.tile(community_ids, (size, 1)).astype(drawn.dtype), drawn[:, :need_num]], axis=1)
+        my_score = HandEvaluator.eval_hands_batch(np.tile(hole_ids, (size, 1)), boards)
+        opponents_score = np.max([HandEvaluator.eval_hands_batch(drawn[:, need_num+2*i:need_num+2*i+2], boards)
+            for i in range(nb_player-1)], axis=0)
+        counts[_WIN] += np.count_nonzero(my_score > opponents_score)
+        counts[_TIE] += np.count_nonzero(my_score == opponents_score)
+        counts[_LOSE] += np.count_nonzero(my_score < opponents_score)
+        total = counts.sum()
+        half_width = _wilson_half_width(counts[_WIN] + counts[_TIE], total)
+        timed_out = time_budget is not None and time.monotonic() - start >= time_budget
+        if half_width <= epsilon or timed_out or total >= max_simulation: break
+    win_count, tie_count, lose_count, total = [int(count) for count in counts] + [int(total)]
+    return {
+            "win": 1.0 * win_count / total,
+            "tie": 1.0 * tie_count / total,
+            "lose": 1.0 * lose_count / total,
+            "nb_simulation": total
+            }
+
+# Simulations are split into chunks of this size, each with its own seed,
+# so the result for a seed does not depend on the number of workers.
+PARALLEL_CHUNK_SIZE = 10000
+
+def estimate_hole_card_win_rate_parallel(nb_simulation, nb_player, hole_card, community_card=None,
+        nb_worker=None, seed=0):
+    win_count, tie_count, _, total = _parallel_equity_counts(
+            nb_simulation, nb_player, hole_card, community_card, nb_worker, seed)
+    return 1.0 * (win_count + tie_count) / total
+
+def estimate_hole_card_equity_parallel(nb_simulation, nb_player, hole_card, community_card=None,
+        nb_worker=None, seed=0):
+    """Monte Carlo estimate_hole_card_equity spread over nb_worker processes.
+
+    nb_worker defaults to the number of CPUs. The same seed gives the same
+    result whatever nb_worker is.
+    """
+    win_count, tie_count, lose_count, total = _parallel_equity_counts(
+            nb_simulation, nb_player, hole_card, community_card, nb_worker, seed)
+    return {
+            "win": 1.0 * win_count / total,
+            "tie": 1.0 * tie_count / total,
+            "lose": 1.0 * lose_count / total
+            }
+
+def preflop_equity(hole_card, nb_player):
+    """Preflop win/tie/lose fractions from the precomputed table (nb_player 2-10)."""
+    if not 2 <= nb_player <= MAX_PLAYER_NUM:
+        raise ValueError("preflop equity table covers 2 to %d players (got %d)" % (MAX_PLAYER_NUM, nb_player))
+    table = load_preflop_equity_table()
+    class_index = hole_card_class_index(hole_card)
+    win = table["win"][class_index][nb_player-2]
+    tie = table["tie"][class_index][nb_player-2]
+    return { "win": win, "tie": tie, "lose": max(0.0, 1.0 - win - tie) }
+
+def canonicalize_cards(hole_card, community_card=None):
+    """Return a hashable key shared by all (hole, board) pairs equal up to a suit permutation.
+
+    Equity and hand class only depend on this key. The order of the board
+    cards does not matter.
+    """
     if not community_card: community_card = []
-    win_count = sum([_montecarlo_simulation(nb_player, hole_card, community_card) for _ in range(nb_simulation)])
-    return 1.0 * win_count / nb_simulation
+    return _canonicalize_ids(_to_ids(hole_card), _to_ids(community_card))
+
+class EquityCache(object):
+    """LRU-bounded map from canonicalized spots to equity counts."""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+
+    def get(self, key):
+        value = self.__entries.pop(key, None)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.__entries[key] = value
+        return value
+
+    def put(self, key, value):
+        self.__entries.pop(key, None)
+        self.__entries[key] = value
+        while len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+
+    def clear(self):
+        self.__entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+_EQUITY_CACHE = EquityCache()
+
+def estimate_hole_card_win_rate_cached(nb_simulation, nb_player, hole_card, community_card=None,
+        exact_threshold=EXACT_ENUMERATION_THRESHOLD, cache=None, rng=random):
+    win_count, tie_count, _, total = _cached_equity_counts(
+            nb_simulation, nb_player, hole_card, community_card, exact_threshold, cache, rng)
+    return 1.0 * (win_count + tie_count) / total
+
+def estimate_hole_card_equity_cached(nb_simulation, nb_player, hole_card, community_card=None,
+        exact_threshold=EXACT_ENUMERATION_THRESHOLD, cache=None, rng=random):
+    """estimate_hole_card_equity answered from cache (process-wide by default) for
+    every spot in the same suit isomorphism class as one already computed."""
+    win_count, tie_count, lose_count, total = _cached_equity_counts(
+            nb_simulation, nb_player, hole_card, community_card, exact_threshold, cache, rng)
+    return {
+            "win": 1.0 * win_count / total,
+            "tie": 1.0 * tie_count / total,
+            "lose": 1.0 * lose_count / total
+            }
+
+def count_equity_combinations(nb_player, community_card_num):
+    unused_num = 52 - 2 - community_card_num
+    need_num = 5 - community_card_num
+    count = _ncr(unused_num, need_num)
+    for i in range(nb_player-1):
+        count *= _ncr(unused_num - need_num - 2*i, 2)
+    for i in range(2, nb_player):
+        count //= i  # opponents are not distinguished
+    return count
 
 def gen_deck(exclude_cards=None):
     deck_ids = range(1, 53)
@@ -18,7 +203,7 @@ def gen_deck(exclude_cards=None):
         assert isinstance(exclude_cards, list)
         if isinstance(exclude_cards[0], str):
             exclude_cards = [Card.from_str(s) for s in exclude_cards]
-        exclude_ids = [card.to_id() for card in exclude_cards]
+        exclude_ids = set(_to_ids(exclude_cards))
         deck_ids = [i for i in deck_ids if not i in exclude_ids]
     return Deck(deck_ids)
 
@@ -30,21 +215,148 @@ def evaluate_hand(hole_card, community_card):
             "strength": HandEvaluator.eval_hand(hole_card, community_card)
             }
 
-def _montecarlo_simulation(nb_player, hole_card, community_card):
-    community_card = _fill_community_card(community_card, used_card=hole_card+community_card)
-    unused_cards = _pick_unused_card((nb_player-1)*2, hole_card + community_card)
-    opponents_hole = [unused_cards[2*i:2*i+2] for i in range(nb_player-1)]
-    opponents_score = [HandEvaluator.eval_hand(hole, community_card) for hole in opponents_hole]
-    my_score = HandEvaluator.eval_hand(hole_card, community_card)
-    return 1 if my_score >= max(opponents_score) else 0
+_WIN, _TIE, _LOSE = 0, 1, 2
+
+def _equity_counts(nb_simulation, nb_player, hole_card, community_card, exact_threshold, rng=random):
+    if not community_card: community_card = []
+    hole_ids, community_ids = _to_ids(hole_card), _to_ids(community_card)
+    counts = [0, 0, 0]
+    # enumeration evaluates about one hand per combination, sampling nb_player per deal
+    if count_equity_combinations(nb_player, len(community_ids)) <= min(exact_threshold, nb_simulation * nb_player):
+        _enumerate_outcomes(counts, nb_player, hole_ids, community_ids)
+    else:
+        for _ in range(nb_simulation):
+            counts[_montecarlo_outcome_ids(nb_player, hole_ids, community_ids, rng)] += 1
+    return counts[_WIN], counts[_TIE], counts[_LOSE], sum(counts)
+
+def _cached_equity_counts(nb_simulation, nb_player, hole_card, community_card, exact_threshold, cache, rng=random):
+    if cache is None: cache = _EQUITY_CACHE
+    if not community_card: community_card = []
+    hole_ids, community_ids = _canonicalize_ids(_to_ids(hole_card), _to_ids(community_card))
+    key = (hole_ids, community_ids, nb_player, nb_simulation, exact_threshold)
+    counts = cache.get(key)
+    if counts is None:
+        hole_card, community_card = _to_cards(hole_ids), _to_cards(community_ids)
+        counts = _equity_counts(nb_simulation, nb_player, hole_card, community_card, exact_threshold, rng)
+        cache.put(key, counts)
+    return counts
+
+# Suits are relabeled in order of their (hole ranks, board ranks) signature.
+# Suits with the same signature hold the same ranks, so ties do not matter.
+def _canonicalize_ids(hole_ids, community_ids):
+    signatures = [([], []) for _ in range(4)]
+    for idx, card_ids in enumerate((hole_ids, community_ids)):
+        for cid in card_ids:
+            signatures[(cid-1) // 13][idx].append((cid-1) % 13)
+    for hole_ranks, board_ranks in signatures:
+        hole_ranks.sort()
+        board_ranks.sort()
+    order = sorted(range(4), key=lambda suit: signatures[suit], reverse=True)
+    relabel = dict((suit, new_suit) for new_suit, suit in enumerate(order))
+    to_canonical = lambda cid: (cid-1) % 13 + 1 + 13 * relabel[(cid-1) // 13]
+    return tuple(sorted([to_canonical(cid) for cid in hole_ids])), tuple(sorted([to_canonical(cid) for cid in community_ids]))
+
+def _parallel_equity_counts(nb_simulation, nb_player, hole_card, community_card, nb_worker, seed):
+    if nb_simulation < 1:
+        raise ValueError("Need at least one simulation [nb_simulation = %s]" % nb_simulation)
+    if not community_card: community_card = []
+    hole_ids, community_ids = _to_ids(hole_card), _to_ids(community_card)
+    chunks = [(nb_player, hole_ids, community_ids, min(PARALLEL_CHUNK_SIZE, nb_simulation - start), "%s-%d" % (seed, idx))
+            for idx, start in enumerate(range(0, nb_simulation, PARALLEL_CHUNK_SIZE))]
+    if nb_worker == 1:
+        chunk_counts = [_simulate_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=nb_worker) as executor:
+            chunk_counts = list(executor.map(_simulate_chunk, chunks))
+    counts = [sum(chunk_count) for chunk_count in zip(*chunk_counts)]
+    return counts[_WIN], counts[_TIE], counts[_LOSE], sum(counts)
+
+def _simulate_chunk(chunk):
+    nb_player, hole_ids, community_ids, nb_simulation, seed = chunk
+    rng = random.Random(seed)
+    counts = [0, 0, 0]
+    for _ in range(nb_simulation):
+        counts[_montecarlo_outcome_ids(nb_player, hole_ids, community_ids, rng)] += 1
+    return counts
+
+def _enumerate_outcomes(counts, nb_player, hole_ids, community_ids):
+    used = set(hole_ids + community_ids)
+    unused_ids = [cid for cid in _ALL_CARD_IDS if cid not in used]
+    for board_rest in combinations(unused_ids, 5 - len(community_ids)):
+        board = community_ids + list(board_rest)
+        my_score = HandEvaluator.eval_hand_ids(hole_ids, board)
+        rest_ids = [cid for cid in unused_ids if cid not in board_rest]
+        hole_score = dict((hole, HandEvaluator.eval_hand_ids(list(hole), board)) for hole in combinations(rest_ids, 2))
+        if nb_player == 2:
+            for score in hole_score.values():
+                counts[_judge(my_score, score)] += 1
+        else:
+            for opponents_hole in _gen_disjoint_holes(rest_ids, nb_player-1):
+                counts[_judge(my_score, max([hole_score[hole] for hole in opponents_hole]))] += 1
+
+# Yields every set of num disjoint hole cards once, each set ordered by its lowest card
+def _gen_disjoint_holes(card_ids, num):
+    if num == 0:
+        yield ()
+        return
+    for i in range(len(card_ids)):
+        for j in range(i+1, len(card_ids)):
+            rest_ids = card_ids[i+1:j] + card_ids[j+1:]
+            for others in _gen_disjoint_holes(rest_ids, num-1):
+                yield ((card_ids[i], card_ids[j]),) + others
+
+# Half width of the 95% Wilson score interval, which does not collapse to 0
+# when every sample is a win (or a loss) as the normal approximation does
+def _wilson_half_width(success, total):
+    z2 = 1.96 ** 2
+    rate = 1.0 * success / total
+    return 1.96 / (1 + z2 / total) * math.sqrt(rate * (1 - rate) / total + z2 / (4.0 * total * total))
+
+def _judge(my_score, best_opponent_score):
+    if my_score > best_opponent_score: return _WIN
+    if my_score == best_opponent_score: return _TIE
+    return _LOSE
+
+def _montecarlo_simulation(nb_player, hole_card, community_card, rng=random):
+    return _montecarlo_simulation_ids(nb_player, _to_ids(hole_card), _to_ids(community_card), rng)
+
+# Works on card ids (see Card.to_id) so that no Card object is created per sample
+def _montecarlo_simulation_ids(nb_player, hole_ids, community_ids, rng=random):
+    return 0 if _montecarlo_outcome_ids(nb_player, hole_ids, community_ids, rng) == _LOSE else 1
 
-def _fill_community_card(base_cards, used_card):
+def _montecarlo_outcome_ids(nb_player, hole_ids, community_ids, rng=random):
+    need_num = 5 - len(community_ids)
+    unused_ids = _pick_unused_card_ids(need_num + (nb_player-1)*2, hole_ids + community_ids, rng)
+    community_ids = community_ids + unused_ids[:need_num]
+    opponents_hole = [unused_ids[need_num+2*i:need_num+2*i+2] for i in range(nb_player-1)]
+    opponents_score = [HandEvaluator.eval_hand_ids(hole, community_ids) for hole in opponents_hole]
+    my_score = HandEvaluator.eval_hand_ids(hole_ids, community_ids)
+    return _judge(my_score, max(opponents_score))
+
+def _fill_community_card(base_cards, used_card, rng=random):
     need_num = 5 - len(base_cards)
-    return base_cards + _pick_unused_card(need_num, used_card)
+    return base_cards + _pick_unused_card(need_num, used_card, rng)
+
+def _pick_unused_card(card_num, used_card, rng=random):
+    return [Card.from_id(card_id) for card_id in _pick_unused_card_ids(card_num, _to_ids(used_card), rng)]
+
+def _pick_unused_card_ids(card_num, used_ids, rng=random):
+    used = set(used_ids)
+    unused = [card_id for card_id in _ALL_CARD_IDS if card_id not in used]
+    return rng.sample(unused, card_num)
+
+def _ncr(n, r):
+    if r < 0 or n < r: return 0
+    count = 1
+    for i in range(r):
+        count = count * (n - i) // (i + 1)
+    return count
+
+def _to_ids(cards):
+    return [card.to_id() for card in cards]
+
+def _to_cards(card_ids):
+    return [Card.from_id(cid) for cid in card_ids]
 
-def _pick_unused_card(card_num, used_card):
-    used = [card.to_id() for card in used_card]
-    unused = [card_id for card_id in range(1, 53) if card_id not in used]
-    choiced = random.sample(unused, card_num)
-    return [Card.from_id(card_id) for card_id in choiced]
+_ALL_CARD_IDS = list(range(1, 53))
 
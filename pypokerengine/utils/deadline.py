@@ -0,0 +1,157 @@
+"""
+Decision deadlines for players.
+
+deadline_budget(seconds, default) wraps declare_action so that every call
+gets a fresh Deadline (a monotonic time limit). When the wrapped function
+is a bound method, the deadline is stored as the player's `deadline`
+attribute before the call, so agents can poll
+
+    self.deadline.remaining()  /  self.deadline.expired()
+
+and stop thinking in time. An answer that misses the deadline is replaced
+by `default`. No signal is used, so this works in any thread or process.
+
+Backends:
+    THREAD : the call runs on a worker thread owned by the wrapper and the
+             caller stops waiting at the deadline. A late call keeps running
+             in the background and its answer is dropped. Until it returns,
+             later calls are not dispatched (so the agent never runs two
+             decisions at once) and get `default` at once; they are counted
+             as skipped, not as timeouts.
+    INLINE : the call runs in the caller's thread and a late answer is only
+             replaced afterwards. Cheapest, for cooperative agents.
+
+A thread cannot be interrupted, so a late call of the THREAD backend may
+still run while the game sends the player its next notifications. Host
+untrusted or stateful agents in their own process with
+utils.agent_host.AgentHost, which kills a late agent instead.
+"""
+
+import queue
+import threading
+import time
+import weakref
+
+THREAD = "thread"
+INLINE = "inline"
+
+# Time limit of one decision in games started by the api
+DECISION_SECONDS = 0.5
+
+class Deadline(object):
+
+    __slots__ = ("budget", "expires_at")
+
+    def __init__(self, seconds):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+def deadline_budget(seconds, default, backend=THREAD, on_timeout=None):
+    """Return a decorator giving each call `seconds` to answer.
+
+    on_timeout(args, kwargs) is called whenever default is returned instead
+    of the answer. The wrapper counts its calls, timeouts and skipped calls.
+    """
+    if backend not in (THREAD, INLINE):
+        raise ValueError("Unknown deadline backend [%s]" % backend)
+    def decorate(function):
+        return _BudgetedFunction(function, seconds, default, backend, on_timeout)
+    return decorate
+
+class _BudgetedFunction(object):
+
+    def __init__(self, function, seconds, default, backend, on_timeout):
+        self.function = function
+        self.seconds = seconds
+        self.default = default
+        self.backend = backend
+        self.on_timeout = on_timeout
+        self.calls = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.__name__ = getattr(function, "__name__", "budgeted_function")
+        self.__doc__ = getattr(function, "__doc__", None)
+        self.__owner = getattr(function, "__self__", None)
+        self.__worker = None
+        self.__late_call = None
+
+    def __call__(self, *args, **kwargs):
+        deadline = Deadline(self.seconds)
+        self.calls += 1
+        if self.backend == INLINE:
+            if self.__owner is not None: self.__owner.deadline = deadline
+            result = self.function(*args, **kwargs)
+            answered = not deadline.expired()
+        else:
+            answered, result = self.__call_on_worker(deadline, args, kwargs)
+        if answered: return result
+        if answered is None:
+            self.skipped += 1
+        else:
+            self.timeouts += 1
+        if self.on_timeout: self.on_timeout(args, kwargs)
+        return self.default
+
+    # Returns (answered, result). answered is None when the call was skipped
+    # because the previous late call is still running.
+    def __call_on_worker(self, deadline, args, kwargs):
+        if self.__late_call is not None:
+            if not self.__late_call.done.is_set(): return None, None
+            self.__late_call = None
+        if self.__owner is not None: self.__owner.deadline = deadline  # not while a late call polls it
+        if self.__worker is None:
+            self.__worker = _Worker()
+            weakref.finalize(self, self.__worker.stop)
+        call = self.__worker.submit(self.function, args, kwargs)
+        if not call.done.wait(deadline.remaining()):
+            self.__late_call = call
+            return False, None
+        if call.error is not None: raise call.error
+        return True, call.result
+
+class _Call(object):
+
+    __slots__ = ("function", "args", "kwargs", "done", "result", "error")
+
+    def __init__(self, function, args, kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+# Daemon thread running calls one after another, so an agent that never
+# answers does not keep the process alive. It stops with its wrapper.
+class _Worker(object):
+
+    def __init__(self):
+        self.__calls = queue.Queue()
+        thread = threading.Thread(target=self.__run)
+        thread.daemon = True
+        thread.start()
+
+    def submit(self, function, args, kwargs):
+        call = _Call(function, args, kwargs)
+        self.__calls.put(call)
+        return call
+
+    def stop(self):
+        self.__calls.put(None)
+
+    def __run(self):
+        while True:
+            call = self.__calls.get()
+            if call is None: return
+            try:
+                call.result = call.function(*call.args, **call.kwargs)
+            except Exception as e:
+                call.error = e
+            call.done.set()
+            call = None  # do not keep the function (and its wrapper) alive while waiting
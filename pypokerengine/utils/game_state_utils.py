@@ -41,16 +41,16 @@ def attach_hole_card(game_state, uuid, hole_card):
     target = [player for player in deepcopy["table"].seats.players if uuid==player.uuid]
     if len(target)==0: raise Exception('The player whose uuid is "%s" is not found in passed game_state.' % uuid)
     if len(target)!=1: raise Exception('Multiple players have uuid "%s". So we cannot attach hole card.' % uuid)
-    target[0].hole_card = hole_card
+    target[0].hole_card_ids = [card.to_id() for card in hole_card]
     return deepcopy
 
 def replace_community_card(game_state, community_card):
     deepcopy = deepcopy_game_state(game_state)
-    deepcopy["table"]._community_card = community_card
+    deepcopy["table"]._community_card = [card.to_id() for card in community_card]
     return deepcopy
 
 def deepcopy_game_state(game_state):
-    tabledeepcopy = Table.deserialize(game_state["table"].serialize())
+    tabledeepcopy = game_state["table"].clone()
     return {
             "round_count": game_state["round_count"],
             "small_blind_amount": game_state["small_blind_amount"],
@@ -83,8 +83,7 @@ def _restore_community_card_on_table(table, card_data):
 def _restore_deck(str_exclude_cards):
     deck = Deck()
     exclude_ids = [Card.to_id(Card.from_str(s)) for s in str_exclude_cards]
-    deck_cards = [Card.from_id(cid) for cid in range(1, 53) if cid not in exclude_ids]
-    deck.deck = deck_cards
+    deck.deck = [cid for cid in range(1, 53) if cid not in exclude_ids]
     return deck
 
 def _restore_seats(seats_info, action_histories):
@@ -101,19 +100,21 @@ def _restore_action_histories_on_players(players, round_action_histories):
     current_street_name = ordered_street_names[-1]
     past_street_names = ordered_street_names[:-1]
 
-    # restore round_action_histories
+    # restore round_action_histories (replaced as a whole so that Player recalculates its aggregates)
+    restored = dict((player.uuid, player.round_action_histories[::]) for player in players)
     for street_name in past_street_names:
         street_flg = _street_flg_translator[street_name]
         action_histories = round_action_histories[street_name]
-        for player in players: player.round_action_histories[street_flg] = []
+        for player in players: restored[player.uuid][street_flg] = []
         for action_history in action_histories:
-            player = _find_user_by_uuid(players, action_history["uuid"])
-            player.round_action_histories[street_flg].append(action_history)
+            restored[action_history["uuid"]][street_flg].append(action_history)
+    for player in players: player.round_action_histories = restored[player.uuid]
 
-    # resotre action_histories
+    # resotre action_histories (also assigned as a whole)
+    restored = dict((player.uuid, player.action_histories[::]) for player in players)
     for action_history in round_action_histories[current_street_name]:
-        player = _find_user_by_uuid(players, action_history["uuid"])
-        player.action_histories.append(action_history)
+        restored[_find_user_by_uuid(players, action_history["uuid"]).uuid].append(action_history)
+    for player in players: player.action_histories = restored[player.uuid]
 
 def _restore_pay_info_on_players(players, players_state, round_action_histories):
     _restore_pay_info_status_on_players(players, players_state)
@@ -0,0 +1,127 @@
+"""
+Think-time accounting for players.
+
+LatencyHistogram is a small HDR-style (log-linear) histogram over integer
+microseconds: values below 2*SUB_BUCKET_NUM are exact and larger ones fall
+into buckets about 1/SUB_BUCKET_NUM (3%) wide, so recording is O(1) and the
+memory does not depend on the number of decisions.
+
+ThinkTimeRecorder keeps one histogram per (player uuid, street) plus the
+number of missed deadlines, and summarizes them per player.
+"""
+
+from pypokerengine.engine.data_encoder import DataEncoder
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_NUM = 1 << SUB_BUCKET_BITS
+
+# Decisions slower than this fraction of the budget are counted as near the deadline
+NEAR_DEADLINE_RATIO = 0.8
+
+class LatencyHistogram(object):
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1000000))
+        index = _bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min: self.min = value
+        if self.max is None or value > self.max: self.max = value
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is None: continue
+            if self.min is None or value < self.min: self.min = value
+            if self.max is None or value > self.max: self.max = value
+        return self
+
+    # Upper bound (in seconds) of the bucket holding the given percentile (0-100)
+    def percentile(self, percent):
+        if self.count == 0: return 0.0
+        rank = max(1, int(round(percent / 100.0 * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank: return min(_bucket_upper(index), self.max) / 1000000.0
+        return self.max / 1000000.0
+
+    def mean(self):
+        return 1.0 * self.total / self.count / 1000000.0 if self.count else 0.0
+
+    def summary(self):
+        return {
+                "count": self.count,
+                "mean": self.mean(),
+                "p50": self.percentile(50),
+                "p90": self.percentile(90),
+                "p99": self.percentile(99),
+                "max": self.max / 1000000.0 if self.count else 0.0
+                }
+
+class ThinkTimeRecorder(object):
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.histograms = {}  # (uuid, street) => LatencyHistogram
+        self.timeouts = {}    # uuid => number of missed deadlines
+        self.near_deadline = {}
+
+    def record(self, uuid, street, seconds, timed_out=False):
+        key = (uuid, street)
+        if key not in self.histograms: self.histograms[key] = LatencyHistogram()
+        self.histograms[key].record(seconds)
+        if timed_out: self.timeouts[uuid] = self.timeouts.get(uuid, 0) + 1
+        if self.budget and seconds >= self.budget * NEAR_DEADLINE_RATIO:
+            self.near_deadline[uuid] = self.near_deadline.get(uuid, 0) + 1
+
+    def summary(self, players):
+        """Return one summary per (uuid, name) pair of players, in that order.
+
+        Each has the latency summary (seconds) over all streets, "timeouts",
+        "near_deadline" and "streets" ({street name: latency summary}).
+        """
+        summaries = []
+        for uuid, name in players:
+            streets = sorted([street for key_uuid, street in self.histograms if key_uuid == uuid])
+            total = LatencyHistogram()
+            for street in streets: total.merge(self.histograms[(uuid, street)])
+            summary = total.summary()
+            summary.update({
+                "name": name,
+                "uuid": uuid,
+                "timeouts": self.timeouts.get(uuid, 0),
+                "near_deadline": self.near_deadline.get(uuid, 0),
+                "streets": dict((DataEncoder.encode_street(street)["street"], self.histograms[(uuid, street)].summary())
+                    for street in streets)
+                })
+            summaries.append(summary)
+        return summaries
+
+def timeout_count(algorithm):
+    """Missed deadlines reported so far by the wrapper of algorithm.declare_action
+    (see utils.deadline) or by its agent host (see utils.agent_host)."""
+    host = getattr(algorithm, "host", None)
+    if host is not None: return getattr(host, "timeouts", 0)
+    return getattr(getattr(algorithm, "declare_action", None), "timeouts", 0)
+
+def _bucket_index(value):
+    if value < 2 * SUB_BUCKET_NUM: return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKET_NUM + (value >> shift)
+
+def _bucket_upper(index):
+    if index < 2 * SUB_BUCKET_NUM: return index
+    shift = index // SUB_BUCKET_NUM - 1
+    return ((index - shift * SUB_BUCKET_NUM + 1) << shift) - 1
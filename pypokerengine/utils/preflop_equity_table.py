@@ -0,0 +1,104 @@
+"""
+Preflop equity of the 169 canonical starting hands against 1-9 random hands.
+
+Hands are indexed on the usual 13x13 grid (row and column ordered A..2):
+pairs on the diagonal, suited hands above it and offsuit hands below it.
+
+File format (little endian):
+    header : magic "PFEQ", version (uint16), class num (uint16), max player num (uint16),
+             simulation num per entry (uint32)
+    body   : win fractions then tie fractions as uint16 (value / 65535),
+             each laid out as [class index][nb_player - 2]
+"""
+
+import os
+import struct
+import time
+from argparse import ArgumentParser
+
+from pypokerengine.engine.card import Card
+
+PREFLOP_EQUITY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equity.bin")
+
+CLASS_NUM = 169
+MAX_PLAYER_NUM = 10
+
+_MAGIC = b"PFEQ"
+_VERSION = 1
+_HEADER_FORMAT = "<4sHHHI"
+_SCALE = 65535
+
+_table = None
+
+def hole_card_class_index(hole_card):
+    high, low = sorted([card.rank for card in hole_card])[::-1]
+    row, col = 14 - high, 14 - low
+    suited = hole_card[0].suit == hole_card[1].suit
+    return row*13 + col if suited or high == low else col*13 + row
+
+def class_representative(class_index):
+    row, col = class_index // 13, class_index % 13
+    suited = row < col
+    high, low = (14 - row, 14 - col) if suited else (14 - col, 14 - row)
+    to_card = lambda suit, rank: Card.from_str(Card.SUIT_MAP[suit] + Card.RANK_MAP[rank])
+    return [to_card(Card.SPADE, high), to_card(Card.SPADE if suited else Card.HEART, low)]
+
+def load_preflop_equity_table():
+    """Return the shipped table, read on first use."""
+    global _table
+    if _table is None:
+        _table = read_preflop_equity_table(PREFLOP_EQUITY_PATH)
+    return _table
+
+# Returns {"win": rows, "tie": rows, "nb_simulation": n}, rows indexed by [class index][nb_player - 2]
+def read_preflop_equity_table(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    header_size = struct.calcsize(_HEADER_FORMAT)
+    magic, version, class_num, max_player_num, nb_simulation = struct.unpack(_HEADER_FORMAT, data[:header_size])
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("%s is not a preflop equity table (version %d)" % (path, _VERSION))
+    width = max_player_num - 1
+    values = struct.unpack("<%dH" % (2 * class_num * width), data[header_size:])
+    to_rows = lambda flat: [[1.0 * v / _SCALE for v in flat[i*width:(i+1)*width]] for i in range(class_num)]
+    return {
+            "win": to_rows(values[:class_num*width]),
+            "tie": to_rows(values[class_num*width:]),
+            "nb_simulation": nb_simulation
+            }
+
+def write_preflop_equity_table(path, win, tie, nb_simulation):
+    width = MAX_PLAYER_NUM - 1
+    values = [int(round(v * _SCALE)) for rows in (win, tie) for row in rows for v in row]
+    header = struct.pack(_HEADER_FORMAT, _MAGIC, _VERSION, CLASS_NUM, MAX_PLAYER_NUM, nb_simulation)
+    with open(path, "wb") as f:
+        f.write(header + struct.pack("<%dH" % (2 * CLASS_NUM * width), *values))
+
+def generate_preflop_equity_table(path=PREFLOP_EQUITY_PATH, nb_simulation=50000, seed=0, verbose=False):
+    from pypokerengine.utils.card_utils import estimate_hole_card_equity_until
+    win = [[0.0] * (MAX_PLAYER_NUM-1) for _ in range(CLASS_NUM)]
+    tie = [[0.0] * (MAX_PLAYER_NUM-1) for _ in range(CLASS_NUM)]
+    start = time.time()
+    for class_index in range(CLASS_NUM):
+        hole_card = class_representative(class_index)
+        for nb_player in range(2, MAX_PLAYER_NUM+1):
+            equity = estimate_hole_card_equity_until(nb_player, hole_card, epsilon=0,
+                    max_simulation=nb_simulation, batch_size=10000, seed=seed*100000 + class_index*100 + nb_player)
+            win[class_index][nb_player-2] = equity["win"]
+            tie[class_index][nb_player-2] = equity["tie"]
+        if verbose:
+            print("%s%s (%d/%d) : %.1f sec" % (
+                str(hole_card[0]), str(hole_card[1]), class_index+1, CLASS_NUM, time.time() - start))
+    write_preflop_equity_table(path, win, tie, nb_simulation)
+
+def parse_arguments():
+    parser = ArgumentParser(description="Generate the preflop equity table")
+    parser.add_argument('-o', '--output', help="Output path", default=PREFLOP_EQUITY_PATH, type=str)
+    parser.add_argument('-n', '--nb_simulation', help="Simulations per hand and player num", default=50000, type=int)
+    parser.add_argument('-s', '--seed', help="Random seed", default=0, type=int)
+    args = parser.parse_args()
+    return args.output, args.nb_simulation, args.seed
+
+if __name__ == '__main__':
+    output, nb_simulation, seed = parse_arguments()
+    generate_preflop_equity_table(output, nb_simulation, seed, verbose=True)
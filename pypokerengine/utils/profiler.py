@@ -0,0 +1,162 @@
+"""
+Per-phase timers for the engine.
+
+Profiler.enable() replaces the engine entry points listed in PHASES with
+timing wrappers and disable() puts the originals back, so nothing is paid
+while profiling is off. Phases nest: a phase called inside another one is
+recorded under it and only its own (self) time is counted for the outer one.
+
+    with Profiler() as profiler:
+        start_poker(config, verbose=0)
+    profiler.summary()                # {"wall", "phases", "stacks"}
+    profiler.write_json(path)
+    profiler.write_folded(path)       # input of flamegraph.pl / speedscope
+
+Only one profiler can be enabled at a time. Phases are only tracked on the
+thread that called enable(): work that agents do on other threads (see
+utils.deadline) is counted as self time of the phase that waits for it, and
+a late answer still running after its deadline is not counted at all.
+Headless games (start_poker(..., headless=True)) call the agents directly,
+so they have no "agent" phase.
+"""
+
+import json
+import threading
+import time
+
+from pypokerengine.engine.round_manager import RoundManager
+from pypokerengine.engine.compact_round_manager import CompactRoundManager
+from pypokerengine.engine.compact_game_state import CompactGameState
+from pypokerengine.engine.table import Table
+from pypokerengine.engine.message_builder import MessageBuilder
+from pypokerengine.engine.data_encoder import DataEncoder
+from pypokerengine.engine.game_evaluator import GameEvaluator
+from pypokerengine.engine.hand_evaluator import HandEvaluator
+from pypokerengine.engine.dealer import MessageHandler
+
+ROOT = "game"
+
+# phase name => [(owner, attribute name)]
+PHASES = {
+    "start_new_round": [(RoundManager, "start_new_round"), (CompactRoundManager, "start_new_round")],
+    "apply_action": [(RoundManager, "apply_action"), (CompactRoundManager, "apply_action")],
+    "state_copy": [(Table, "clone"), (CompactGameState, "copy")],
+    "build_message": [(MessageBuilder, name) for name in (
+        "build_game_start_message", "build_round_start_message", "build_street_start_message",
+        "build_ask_message", "build_game_update_message", "build_round_result_message",
+        "build_game_result_message")],
+    "encode_message": [(DataEncoder, "encode_round_state"), (DataEncoder, "encode_action_histories")],
+    "judge": [(GameEvaluator, "judge")],
+    "eval_hand": [(HandEvaluator, "eval_hand"), (HandEvaluator, "eval_hand_ids")],
+    "agent": [(MessageHandler, "process_message")]
+}
+
+class Profiler(object):
+
+    _enabled = None
+
+    def __init__(self, phases=None):
+        self.phases = PHASES if phases is None else dict((name, PHASES[name]) for name in phases)
+        self.reset()
+
+    def reset(self):
+        self.stacks = {}  # (ROOT, phase, ...) => [count, total us, self us]
+        self.wall = 0.0
+        self.__stack = [ROOT]
+        self.__children = [0.0]
+        self.__originals = []
+        self.__start = None
+        self.__thread = None
+
+    def enable(self):
+        if Profiler._enabled is not None:
+            raise RuntimeError("Another profiler is already enabled")
+        Profiler._enabled = self
+        self.__thread = threading.get_ident()
+        for phase, targets in self.phases.items():
+            for owner, name in targets:
+                original = owner.__dict__[name]
+                self.__originals.append((owner, name, original))
+                setattr(owner, name, self.__wrap(phase, owner, name, original))
+        self.__start = time.perf_counter()
+        return self
+
+    def disable(self):
+        if Profiler._enabled is not self: return
+        wall = time.perf_counter() - self.__start
+        self.wall += wall
+        root = self.stacks.setdefault((ROOT,), [0, 0.0, 0.0])
+        root[0] += 1
+        root[1] += wall * 1000000.0
+        root[2] += (wall - self.__children[0]) * 1000000.0
+        self.__children[0] = 0.0
+        for owner, name, original in reversed(self.__originals):
+            setattr(owner, name, original)
+        self.__originals = []
+        Profiler._enabled = None
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def summary(self):
+        """Return {"wall": seconds, "phases": {phase: {"count", "total", "self"}},
+        "stacks": {"game;phase;...": {"count", "total", "self"}}} with times in seconds."""
+        phases = {}
+        for path, (count, total, self_time) in self.stacks.items():
+            entry = phases.setdefault(path[-1], {"count": 0, "total": 0.0, "self": 0.0})
+            entry["count"] += count
+            entry["self"] += self_time / 1000000.0
+            if path[-1] not in path[:-1]: entry["total"] += total / 1000000.0  # outermost call only
+        stacks = dict((";".join(path), { "count": count, "total": total / 1000000.0, "self": self_time / 1000000.0 })
+                for path, (count, total, self_time) in self.stacks.items())
+        return { "wall": self.wall, "phases": phases, "stacks": stacks }
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2, sort_keys=True)
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_json())
+
+    # "game;apply_action;build_message 1234" lines (self time in microseconds)
+    def to_folded(self):
+        return "\n".join(["%s %d" % (";".join(path), int(round(self_time)))
+            for path, (_, _, self_time) in sorted(self.stacks.items())]) + "\n"
+
+    def write_folded(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_folded())
+
+    def __wrap(self, phase, owner, name, original):
+        function = getattr(owner, name)  # bound to owner for classmethods
+        profiler = self
+        def timed(*args, **kwargs):
+            if threading.get_ident() != profiler.__thread: return function(*args, **kwargs)
+            depth = profiler.__push(phase)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.__pop(depth, time.perf_counter() - start)
+        if isinstance(original, classmethod): return staticmethod(timed)
+        return timed
+
+    def __push(self, phase):
+        self.__stack.append(phase)
+        self.__children.append(0.0)
+        return len(self.__stack) - 1
+
+    def __pop(self, depth, elapsed):
+        path = tuple(self.__stack[:depth+1])
+        children = self.__children[depth]
+        del self.__stack[depth:]
+        del self.__children[depth:]
+        self.__children[-1] += elapsed
+        entry = self.stacks.get(path)
+        if entry is None: entry = self.stacks[path] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed * 1000000.0
+        entry[2] += (elapsed - children) * 1000000.0
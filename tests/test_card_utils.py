@@ -0,0 +1,22 @@
+import unittest
+
+from pypokerengine.utils.card_utils import estimate_hole_card_equity_until, gen_cards
+
+class EquityUntilTest(unittest.TestCase):
+
+    def test_all_wins_do_not_stop_after_first_batch(self):
+        hole_card = gen_cards(["SA", "HA"])
+        community_card = gen_cards(["SK", "HK", "DA", "CA", "D2"])
+        equity = estimate_hole_card_equity_until(2, hole_card, community_card, epsilon=0.01, batch_size=10, seed=0)
+        self.assertEqual(1.0, equity["win"])
+        self.assertGreater(equity["nb_simulation"], 10)
+
+    def test_invalid_sizes_are_rejected(self):
+        hole_card = gen_cards(["SA", "HK"])
+        with self.assertRaises(ValueError):
+            estimate_hole_card_equity_until(2, hole_card, batch_size=0)
+        with self.assertRaises(ValueError):
+            estimate_hole_card_equity_until(2, hole_card, max_simulation=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import random
+import unittest
+
+from pypokerengine.engine.action_checker import ActionChecker
+from pypokerengine.engine.compact_game_state import CompactGameState
+from pypokerengine.engine.compact_round_manager import CompactRoundManager
+from pypokerengine.engine.data_encoder import DataEncoder
+from pypokerengine.engine.player import Player
+from pypokerengine.engine.poker_constants import PokerConstants as Const
+from pypokerengine.engine.round_manager import RoundManager
+from pypokerengine.engine.table import Table
+
+def seated_table(stacks, seed):
+    table = Table(rng=random.Random(seed))
+    for pos, stack in enumerate(stacks):
+        table.seats.sitdown(Player("uuid-%d" % pos, stack, "p%d" % pos))
+    table.set_blind_pos(0, 1)
+    return table
+
+class CompactRoundManagerTest(unittest.TestCase):
+
+    # Short stacks so that rounds end in all-ins and side pots as well
+    def test_rounds_match_round_manager(self):
+        for seed in range(30):
+            rng = random.Random(seed)
+            stacks = [rng.choice([60, 150, 400, 1000]) for _ in range(rng.randint(2, 6))]
+            ante = rng.choice([0, 5])
+            state, _ = RoundManager.start_new_round(1, 10, ante, seated_table(stacks, seed))
+            compact = CompactRoundManager.start_new_round(1, 10, ante,
+                    CompactGameState.from_table(seated_table(stacks, seed)))
+            self.assert_same_state(state, compact, seed)
+            while state["street"] != Const.Street.FINISHED:
+                names = [action["action"] for action in self.legal_actions(state)]
+                self.assertEqual(names, list(CompactRoundManager.legal_action_names(compact)), seed)
+                action = rng.choice(["fold", "call", "call", "raise", "raise"])
+                state, _ = RoundManager.apply_action(state, action)
+                compact = CompactRoundManager.apply_action(compact, action)
+                self.assert_same_state(state, compact, seed)
+            self.assertEqual(Const.Street.FINISHED, compact.street)
+
+    def test_copy_does_not_share_data(self):
+        compact = CompactRoundManager.start_new_round(1, 10, 0,
+                CompactGameState.from_table(seated_table([1000, 1000, 1000], 0)))
+        before = DataEncoder.encode_round_state(compact.to_game_state())
+        CompactRoundManager.apply_action(compact, "raise")
+        self.assertEqual(before, DataEncoder.encode_round_state(compact.to_game_state()))
+
+    def assert_same_state(self, state, compact, seed):
+        restored = compact.to_game_state()
+        self.assertEqual(DataEncoder.encode_round_state(state), DataEncoder.encode_round_state(restored), seed)
+        players = state["table"].seats.players
+        self.assertEqual([p.hole_card_ids for p in players], [compact.hole_card_ids(pos) for pos in range(len(players))])
+        self.assertEqual(state["table"].deck.deck, compact.deck_card_ids())
+
+    def legal_actions(self, state):
+        players = state["table"].seats.players
+        return ActionChecker.legal_actions(players, state["next_player"], state["small_blind_amount"], state["street"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+
+from pypokerengine.utils.deadline import deadline_budget
+
+class SlowOncePlayer(object):
+
+    def __init__(self, slow_seconds):
+        self.slow_seconds = slow_seconds
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def declare_action(self):
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            slow = self.calls == 1
+        if slow: time.sleep(self.slow_seconds)
+        with self.lock:
+            self.running -= 1
+        return "call"
+
+class DeadlineBudgetTest(unittest.TestCase):
+
+    def test_overrun_is_one_timeout_and_later_calls_do_not_wait(self):
+        player = SlowOncePlayer(0.5)
+        declare_action = deadline_budget(0.1, "fold")(player.declare_action)
+        self.assertEqual("fold", declare_action())
+        start = time.time()
+        self.assertEqual("fold", declare_action())  # the late call is still running
+        self.assertLess(time.time() - start, 0.05)
+        time.sleep(0.5)
+        self.assertEqual(["call", "call"], [declare_action() for _ in range(2)])
+        self.assertEqual(1, declare_action.timeouts)
+        self.assertEqual(1, declare_action.skipped)
+        self.assertEqual(4, declare_action.calls)
+
+    def test_agent_never_runs_two_decisions_at_once(self):
+        player = SlowOncePlayer(0.3)
+        declare_action = deadline_budget(0.05, "fold")(player.declare_action)
+        end = time.time() + 0.5
+        while time.time() < end: declare_action()
+        self.assertEqual(1, player.max_running)
+        self.assertEqual(1, declare_action.timeouts)
+
+    def test_deadline_is_set_on_owner(self):
+        player = SlowOncePlayer(0)
+        declare_action = deadline_budget(0.2, "fold")(player.declare_action)
+        declare_action()
+        self.assertEqual(0.2, player.deadline.budget)
+
+if __name__ == "__main__":
+    unittest.main()
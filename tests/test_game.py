@@ -0,0 +1,45 @@
+import random
+import unittest
+
+from pypokerengine.api.game import setup_config, start_poker
+from pypokerengine.players import BasePokerPlayer, BaseHeadlessPlayer
+
+class RandomPlayer(BasePokerPlayer):
+
+    ignored_notifications = ("game_start_message", "round_start_message", "street_start_message",
+            "game_update_message", "round_result_message")
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def declare_action(self, valid_actions, hole_card, round_state):
+        return self.rng.choice([action["action"] for action in valid_actions] + ["call", "call"])
+
+class HeadlessRandomPlayer(BaseHeadlessPlayer):
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def declare_action(self, state, legal_actions):
+        return self.rng.choice(list(legal_actions) + ["call", "call"])
+
+class GameTest(unittest.TestCase):
+
+    # Same seeds and same decisions: the headless loop must play the same game
+    def test_headless_game_matches_message_driven_game(self):
+        for seed in range(12):
+            player_num = 2 + seed % 5
+            self.assertEqual(self.play(RandomPlayer, seed, player_num, headless=False),
+                    self.play(HeadlessRandomPlayer, seed, player_num, headless=True), seed)
+
+    def play(self, player_class, seed, player_num, headless):
+        config = setup_config(max_round=100, initial_stack=300, small_blind_amount=5)
+        config.set_blind_structure({20: {"ante": 0, "small_blind": 10}, 60: {"ante": 0, "small_blind": 25}})
+        for pos in range(player_num):
+            config.register_player("p%d" % pos, player_class(seed*10 + pos))
+        result = start_poker(config, verbose=0, headless=headless, rng=random.Random(seed))
+        result.pop("think_time", None)
+        return result
+
+if __name__ == "__main__":
+    unittest.main()
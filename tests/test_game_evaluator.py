@@ -0,0 +1,58 @@
+import random
+import unittest
+
+from pypokerengine.engine.game_evaluator import GameEvaluator
+from pypokerengine.engine.pay_info import PayInfo
+from pypokerengine.engine.player import Player
+from pypokerengine.engine.table import Table
+
+def build_table(pays, hole_card_ids, community_card_ids):
+    table = Table()
+    for pos, ((amount, status), hole) in enumerate(zip(pays, hole_card_ids)):
+        player = Player("uuid-%d" % pos, 1000, "p%d" % pos)
+        player.add_holecard_ids(hole)
+        player.pay_info = PayInfo(amount, status)
+        table.seats.sitdown(player)
+    for card_id in community_card_ids: table.add_community_card_id(card_id)
+    return table
+
+# The pot rule calc_pots replaced: one side pot per all-in player (by amount)
+# holding what everyone paid up to that amount, then the main pot
+def reference_pots(pay_amounts, statuses):
+    allin_amounts = sorted([amount for amount, status in zip(pay_amounts, statuses) if status == PayInfo.ALLIN])
+    pots = []
+    for allin_amount in allin_amounts:
+        amount = sum([min(allin_amount, pay) for pay in pay_amounts]) - sum([pot[0] for pot in pots])
+        eligibles = [pos for pos, (pay, status) in enumerate(zip(pay_amounts, statuses))
+                if pay >= allin_amount and status != PayInfo.FOLDED]
+        pots.append((amount, eligibles))
+    max_pay = max(pay_amounts)
+    main_eligibles = [pos for pos, pay in enumerate(pay_amounts) if pay == max_pay]
+    return pots + [(sum(pay_amounts) - sum([pot[0] for pot in pots]), main_eligibles)]
+
+class GameEvaluatorTest(unittest.TestCase):
+
+    # From a seeded 3-player game: both blinds folded to a player who paid nothing
+    def test_pot_of_folded_players_goes_to_active_player(self):
+        table = build_table([(20, PayInfo.FOLDED), (10, PayInfo.FOLDED), (0, PayInfo.PAY_TILL_END)],
+                [[46, 45], [31, 36], [20, 51]], [26, 52, 6, 24, 35])
+        winners, _, prize_map = GameEvaluator.judge(table)
+        self.assertEqual(["uuid-2"], [player.uuid for player in winners])
+        self.assertEqual({ 0: 0, 1: 0, 2: 30 }, prize_map)
+
+    def test_main_pot_of_folded_players_goes_with_side_pot(self):
+        pots = GameEvaluator.calc_pots([100, 300, 300], [PayInfo.ALLIN, PayInfo.FOLDED, PayInfo.FOLDED])
+        self.assertEqual([(300, [0]), (400, [1, 2])], pots)
+        self.assertEqual({ 0: 700, 1: 0, 2: 0 }, GameEvaluator.calc_prize_distribution(pots, { 0: 1 }, 3))
+    def test_calc_pots_matches_reference(self):
+        rng = random.Random(0)
+        statuses = [PayInfo.PAY_TILL_END, PayInfo.ALLIN, PayInfo.FOLDED]
+        for _ in range(2000):
+            player_num = rng.randint(2, 9)
+            pay_amounts = [rng.choice([0, 10, 20, 50, 100, 150, 300]) for _ in range(player_num)]
+            pay_statuses = [rng.choice(statuses) for _ in range(player_num)]
+            self.assertEqual(reference_pots(pay_amounts, pay_statuses),
+                    GameEvaluator.calc_pots(pay_amounts, pay_statuses), (pay_amounts, pay_statuses))
+
+if __name__ == "__main__":
+    unittest.main()
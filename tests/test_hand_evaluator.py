@@ -0,0 +1,66 @@
+import json
+import os
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pypokerengine.engine.card import Card
+from pypokerengine.engine.hand_evaluator import HandEvaluator
+from pypokerengine.engine.hand_state import HandState
+
+# [card ids (hole, then community), score, (gen_hand_rank_info)] computed by
+# the predicate cascade HandEvaluator had before the lookup tables: 1000
+# random 7-card hands and one hand per rare category at the end.
+REFERENCE_PATH = os.path.join(os.path.dirname(__file__), "data", "hand_evaluator_reference.json")
+
+def load_reference():
+    with open(REFERENCE_PATH) as f:
+        return json.load(f)
+
+class HandEvaluatorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = load_reference()
+
+    def test_eval_hand_matches_reference(self):
+        for entry in self.reference:
+            ids, score = entry[:2]
+            cards = [Card.from_id(cid) for cid in ids]
+            self.assertEqual(score, HandEvaluator.eval_hand(cards[:2], cards[2:]), ids)
+
+    def test_eval_hand_ids_matches_reference(self):
+        for entry in self.reference:
+            ids, score = entry[:2]
+            self.assertEqual(score, HandEvaluator.eval_hand_ids(ids[:2], ids[2:]), ids)
+
+    def test_gen_hand_rank_info_matches_reference(self):
+        for entry in self.reference:
+            if len(entry) < 3: continue
+            ids, _, hand_info = entry
+            cards = [Card.from_id(cid) for cid in ids]
+            self.assertEqual(hand_info, HandEvaluator.gen_hand_rank_info(cards[:2], cards[2:]), ids)
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_eval_hands_batch_matches_reference(self):
+        ids = np.array([entry[0] for entry in self.reference])
+        scores = HandEvaluator.eval_hands_batch(ids[:, :2], ids[:, 2:])
+        self.assertEqual([entry[1] for entry in self.reference], scores.tolist())
+
+    def test_hand_state_matches_eval_hand_ids_on_every_street(self):
+        for entry in self.reference[:200]:
+            ids = entry[0]
+            state = HandState.from_ids(ids[:2])
+            for community_num, street_ids in ((3, ids[2:5]), (4, ids[5:6]), (5, ids[6:7])):
+                expected_next = dict((cid, HandEvaluator.eval_hand_ids(ids[:2], ids[2:2+community_num] + [cid]))
+                        for cid in range(1, 53) if cid not in ids[:2+community_num]) if community_num < 5 else None
+                for cid in street_ids: state.add_card_id(cid)
+                self.assertEqual(HandEvaluator.eval_hand_ids(ids[:2], ids[2:2+community_num]), state.score())
+                if expected_next: self.assertEqual(expected_next, state.next_card_scores())
+            self.assertEqual(entry[1], state.score())
+
+if __name__ == "__main__":
+    unittest.main()
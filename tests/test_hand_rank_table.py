@@ -0,0 +1,31 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+
+from pypokerengine.engine import hand_rank_table
+
+class HandRankTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "table.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_shipped_table_matches_built_table(self):
+        self.assertEqual(hand_rank_table.build_tables(), hand_rank_table.read_tables(hand_rank_table.HAND_RANK_TABLE_PATH))
+
+    def test_invalid_files_are_rejected(self):
+        with open(hand_rank_table.HAND_RANK_TABLE_PATH, "rb") as f:
+            data = f.read()
+        for corrupted, error in ((b"XXXX" + data[4:], ValueError), (data[:-100], zlib.error)):
+            with open(self.path, "wb") as f:
+                f.write(corrupted)
+            with self.assertRaises(error):
+                hand_rank_table.read_tables(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import random
+import unittest
+
+from pypokerengine.engine.data_encoder import DataEncoder
+from pypokerengine.engine.player import Player
+from pypokerengine.engine.poker_constants import PokerConstants as Const
+from pypokerengine.engine.round_manager import RoundManager
+from pypokerengine.engine.table import Table
+from pypokerengine.utils.game_state_utils import restore_game_state
+
+# Aggregates recalculated from the histories, as the original Player did
+def expected_stats(player):
+    pays = [h for h in player.action_histories if h["action"] not in ["FOLD", "ANTE"]]
+    raises = [h for h in player.action_histories if h["action"] in ["RAISE", "SMALLBLIND", "BIGBLIND"]]
+    last_raise = None
+    for h in raises:
+        if last_raise is None or h["amount"] > last_raise["amount"]: last_raise = h
+    saved_raise_num = 0
+    for histories in player.round_action_histories:
+        if histories is None: break
+        saved_raise_num += len([h for h in histories if h["action"] == "RAISE"])
+    street_raise_num = len([h for h in player.action_histories if h["action"] == "RAISE"])
+    return pays[-1]["amount"] if pays else 0, last_raise, saved_raise_num + street_raise_num
+
+def stats(player):
+    return player.paid_sum(), player.last_raise(), player.round_raise_num()
+
+class PlayerAggregatesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player = Player("uid", 1000)
+
+    def assert_consistent(self, player):
+        self.assertEqual(expected_stats(player), stats(player))
+
+    def test_add_action_history(self):
+        self.player.add_action_history(Const.Action.ANTE, 5)
+        self.player.add_action_history(Const.Action.BIG_BLIND, sb_amount=5)
+        self.assert_consistent(self.player)
+        self.player.add_action_history(Const.Action.RAISE, 30, 20)
+        self.player.add_action_history(Const.Action.CALL, 50)
+        self.assert_consistent(self.player)
+        self.assertEqual((50, self.player.action_histories[2], 1), stats(self.player))
+        self.player.add_action_history(Const.Action.FOLD)
+        self.assertEqual(50, self.player.paid_sum())
+
+    def test_save_street_action_histories(self):
+        self.player.add_action_history(Const.Action.RAISE, 30, 20)
+        self.player.save_street_action_histories(Const.Street.PREFLOP)
+        self.assertEqual((0, None, 1), stats(self.player))
+        self.player.add_action_history(Const.Action.RAISE, 20, 20)
+        self.player.save_street_action_histories(Const.Street.FLOP)
+        self.assertEqual(2, self.player.round_raise_num())
+        self.player.save_street_action_histories(Const.Street.FLOP)  # saved again with no action
+        self.assert_consistent(self.player)
+        self.assertEqual(1, self.player.round_raise_num())
+
+    def test_save_street_out_of_order(self):
+        self.player.add_action_history(Const.Action.RAISE, 30, 20)
+        self.player.save_street_action_histories(Const.Street.TURN)
+        self.assert_consistent(self.player)
+        self.assertEqual(0, self.player.round_raise_num())
+
+    def test_clear_action_histories(self):
+        self.player.add_action_history(Const.Action.RAISE, 30, 20)
+        self.player.save_street_action_histories(Const.Street.PREFLOP)
+        self.player.add_action_history(Const.Action.CALL, 30)
+        self.player.clear_action_histories()
+        self.assertEqual((0, None, 0), stats(self.player))
+
+    def test_assign_histories(self):
+        self.player.add_action_history(Const.Action.CALL, 10)
+        other = Player("other", 1000)
+        other.add_action_history(Const.Action.RAISE, 40, 20)
+        other.save_street_action_histories(Const.Street.PREFLOP)
+        other.add_action_history(Const.Action.RAISE, 20, 20)
+        self.player.round_action_histories = other.round_action_histories[::]
+        self.player.action_histories = other.action_histories[::]
+        self.assert_consistent(self.player)
+        self.assertEqual((20, self.player.action_histories[0], 2), stats(self.player))
+
+    def test_clone_and_serialize(self):
+        self.player.add_action_history(Const.Action.RAISE, 30, 20)
+        self.player.save_street_action_histories(Const.Street.PREFLOP)
+        self.player.add_action_history(Const.Action.CALL, 10)
+        clone = self.player.clone()
+        self.assertEqual(stats(self.player), stats(clone))
+        clone.add_action_history(Const.Action.RAISE, 40, 30)
+        self.assert_consistent(clone)
+        self.assert_consistent(self.player)
+        self.assertEqual(stats(self.player), stats(Player.deserialize(self.player.serialize())))
+
+    def test_restore_game_state(self):
+        rng = random.Random(0)
+        table = Table(rng=random.Random(0))
+        for pos in range(4): table.seats.sitdown(Player("uuid-%d" % pos, 1000, "p%d" % pos))
+        table.set_blind_pos(0, 1)
+        state, _ = RoundManager.start_new_round(1, 10, 0, table)
+        while state["street"] < Const.Street.RIVER:
+            state, _ = RoundManager.apply_action(state, rng.choice(["call", "raise"]))
+            restored = restore_game_state(DataEncoder.encode_round_state(state))
+            for player, restored_player in zip(state["table"].seats.players, restored["table"].seats.players):
+                self.assert_consistent(restored_player)
+                self.assertEqual(stats(player), stats(restored_player))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from pypokerengine.engine.player import Player
+from pypokerengine.engine.poker_constants import PokerConstants as Const
+from pypokerengine.engine.round_manager import RoundManager
+from pypokerengine.engine.table import Table
+
+def seated_table(player_num, seed=0):
+    table = Table(rng=random.Random(seed))
+    for pos in range(player_num):
+        table.seats.sitdown(Player("uuid-%d" % pos, 10000, "p%d" % pos))
+    table.set_blind_pos(0, 1)
+    return table
+
+class CountingClones(object):
+
+    def __enter__(self):
+        self.count = 0
+        self.original = Table.clone
+        def clone(table):
+            self.count += 1
+            return self.original(table)
+        Table.clone = clone
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        Table.clone = self.original
+
+class RoundManagerTest(unittest.TestCase):
+
+    def test_one_table_snapshot_per_action(self):
+        rng = random.Random(0)
+        for round_count in range(1, 21):
+            state, _ = RoundManager.start_new_round(round_count, 10, 0, seated_table(6, round_count), inplace=True)
+            while state["street"] != Const.Street.FINISHED:
+                street = state["street"]
+                action = rng.choice(["fold", "call", "call", "raise"])
+                with CountingClones() as clones:
+                    state, messages = RoundManager.apply_action(state, action, inplace=True)
+                    for _, message in messages: dict(message["message"])  # read every lazy field
+                if state["street"] == street:
+                    self.assertEqual(1, clones.count)
+                else:  # the update message and the next street's messages see different tables
+                    self.assertLessEqual(clones.count, 2)
+
+    def test_shared_snapshot_is_not_updated_by_later_actions(self):
+        state, _ = RoundManager.start_new_round(1, 10, 0, seated_table(3), inplace=True)
+        state, messages = RoundManager.apply_action(state, "call", inplace=True)
+        update, ask = [message["message"] for _, message in messages]
+        RoundManager.apply_action(state, "raise", inplace=True)
+        for message in (update, ask):  # read after the table changed
+            self.assertEqual(50, message["round_state"]["pot"]["main"]["amount"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import random
+import unittest
+
+from pypokerengine.engine.deck import Deck
+from pypokerengine.engine.table import Table
+
+class TableRngTest(unittest.TestCase):
+
+    def shuffled(self, table):
+        table.deck.shuffle()
+        return table.deck.deck
+
+    def test_deserialized_table_shuffles_with_given_rng(self):
+        serial = Table(rng=random.Random(1)).serialize()
+        expected = self.shuffled(Table(rng=random.Random(7)))
+        self.assertEqual(expected, self.shuffled(Table.deserialize(serial, rng=random.Random(7))))
+
+    def test_deserialized_deck_keeps_rng(self):
+        rng = random.Random(3)
+        self.assertIs(rng, Deck.deserialize(Deck().serialize(), rng=rng).rng)
+        self.assertIs(random, Deck.deserialize(Deck().serialize()).rng)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import random
+import unittest
+
+from pypokerengine.api.tournament import run_tournament
+from pypokerengine.players import BasePokerPlayer
+
+class RandomCallPlayer(BasePokerPlayer):
+
+    def declare_action(self, valid_actions, hole_card, round_state):
+        return "raise" if len(valid_actions) == 3 and random.random() < 0.3 else "call"
+
+    def receive_game_start_message(self, game_info):
+        pass
+
+    def receive_round_start_message(self, round_count, hole_card, seats):
+        pass
+
+    def receive_street_start_message(self, street, round_state):
+        pass
+
+    def receive_game_update_message(self, new_action, round_state):
+        pass
+
+    def receive_round_result_message(self, winners, hand_info, round_state):
+        pass
+
+class TournamentTest(unittest.TestCase):
+
+    def play(self, seed):
+        players = [("p1", RandomCallPlayer), ("p2", RandomCallPlayer)]
+        result = run_tournament(players, 2, 5, 1000, 10, seed=seed, nb_worker=1)
+        return [game["stacks"] for game in result["games"]]
+
+    def test_inline_games_keep_global_random_state(self):
+        random.seed(42)
+        state = random.getstate()
+        self.play(0)
+        self.assertEqual(state, random.getstate())
+
+    def test_same_seed_same_games(self):
+        self.assertEqual(self.play(3), self.play(3))
+
+if __name__ == "__main__":
+    unittest.main()